@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from scipy import sparse
+from scipy import stats as scipy_stats
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
@@ -10,8 +12,21 @@ import re
 import unicodedata
 from io import StringIO
 import base64
+import hashlib
+import json
 import tempfile
+import shutil
+from contextlib import contextmanager
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
 import os
+import threading
+import asyncio
+import atexit
+import uuid
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 import io
 from urllib.parse import quote
@@ -380,60 +395,789 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load and process data
-@st.cache_data
-def load_data():
-    """Load and process the survey data"""
+# Snapshot dependencies (pyarrow ships with streamlit, but keep the app usable without it)
+try:
+    import pyarrow  # noqa: F401
+    import pyarrow.parquet as pq
+    SNAPSHOT_AVAILABLE = True
+except ImportError:
+    SNAPSHOT_AVAILABLE = False
+
+DATA_PATH = os.path.join("data", "data_renamefinal.csv")
+SNAPSHOT_DIR = os.path.join("data", ".snapshots")
+WAVES_DIR = os.path.join("data", "waves")
+SENTIMENT_LEXICON_PATH = os.path.join("data", "sentiment_lexicon.json")
+
+# Bump whenever the cleaning steps change so stale snapshots are never reused
+CLEANING_VERSION = 6
+
+def compute_file_hash(path, limit=None, chunk_size=1 << 20):
+    """Content hash of a source file (or of its first ``limit`` bytes)"""
+    digest = hashlib.sha256()
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            block = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+def source_signature(path):
+    """Cheap change-detection key for a source file, or None if it does not exist"""
     try:
-        df = pd.read_csv("data/data_renamefinal.csv")
-        
-        # Clean data similar to notebook
-        df = df.dropna(subset=["gender", "age", "monthly_income"]).reset_index(drop=True)
-        df["age"] = df["age"].astype(int)
-        
-                # Income midpoint calculation
-        def income_to_midpoint(x):
-            if pd.isna(x):
-                return np.nan
-            nums = list(map(int, re.findall(r"\d+", str(x).replace(",", ""))))
-            return np.mean(nums) if nums else np.nan
-
-        df["income_mid"] = df["monthly_income"].apply(income_to_midpoint)
-        
-        # Price range processing
-        def price_range_to_midpoint(x):
-            if pd.isna(x):
-                return np.nan
-            nums = list(map(int, re.findall(r"\d+", str(x).replace(",", ""))))
-            if len(nums) >= 2:
-                return np.mean(nums)
-            elif len(nums) == 1:
-                return nums[0]
-            else:
-                return np.nan
-        
-        if 'preferred_price_range ' in df.columns:
-            df["price_midpoint"] = df["preferred_price_range "].apply(price_range_to_midpoint)
-        elif 'preferred_price_range' in df.columns:
-            df["price_midpoint"] = df["preferred_price_range"].apply(price_range_to_midpoint)
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def snapshot_path(source_path, source_hash):
+    """Snapshot file for a given source content hash and cleaning version"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(SNAPSHOT_DIR, f"{stem}-{source_hash[:16]}-v{CLEANING_VERSION}.parquet")
+
+def read_snapshot(path):
+    """Read a cleaned snapshot, or None if it is missing or unreadable"""
+    if not SNAPSHOT_AVAILABLE or not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"Error reading snapshot {path}: {e}")
+        return None
+
+def write_snapshot(df, path):
+    """Persist a cleaned frame atomically so concurrent replicas never see a partial file"""
+    if not SNAPSHOT_AVAILABLE:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing snapshot {path}: {e}")
+
+# Closed-choice answer columns stored as categoricals. The category order is fixed here so
+# integer codes stay stable between reloads; answers outside the list (e.g. "other" free text)
+# are appended after the known options. Flag = ordinal scale.
+CATEGORY_SCHEMA = {
+    "gender": (["หญิง", "ชาย", "LGBTQ+"], False),
+    "occupation": (["นักเรียน/นักศึกษา", "พนักงานบริษัทเอกชน", "งานราชการ", "ธุรกิจส่วนตัว",
+                    "ฟรีแลนซ์ / อาชีพอิสระ", "ว่างงาน"], False),
+    "monthly_income": (["0 - 5,000 บาท", "5,001 - 10,000 บาท", "10,001 - 15,000 บาท",
+                        "15,001 - 20,000 บาท", "20,001 - 25,000 บาท", "25,000 บาทขึ้นไป"], True),
+    "own_luggage": (["มี", "ยืม,ใช้ของครอบครัว", "ไม่มี"], False),
+    "luggage_frequency": (["ยังไม่เคยใช้เลย", "ปีละครั้งหรือน้อยกว่านั้น", "2–3 ครั้งต่อปี",
+                           "มากกว่า 4 ครั้งต่อปี"], True),
+    "buy_frequency": (["ยังไม่เคยซื้อกระเป๋าเดินทางเอง", "ทุก ๆ 4-5 ปี", "ทุก ๆ 2-3 ปี",
+                       "ปีละครั้ง", "มากกว่า 1 ครั้งต่อปี"], True),
+    "preferred_price_range": (["ไม่เกิน 1,000 บาท", "1,001–1,500 บาท", "1,501–2,500 บาท",
+                               "2,501–3,500 บาท", "มากกว่า 3,500 บาท"], True),
+    "most_used_platform": (["TikTok", "Instagram", "Facebook", "X (Twitter)", "Youtube",
+                            "Line", "Lemon 8"], False),
+    "brand_sales_type": ([
+        "Online Reviews and Recommendations - รีวิวจากผู้ใช้จริง",
+        "Discounts and Promotions - คูปองส่วนลดหรือโปรโมชั่น",
+        "Soft Sale - ขายแบบค่อยเป็นค่อยไป",
+        "Hard Sale - ไลฟ์ขายของตลอดเวลา",
+        "Interactive Shopping - การชอปปิงที่สามารถโต้ตอบกับแบรนด์ได้ เช่น การสอบถามผ่านแชท",
+        "Personalized Offers - ชอบข้อเสนอที่เหมาะกับความสนใจหรือพฤติกรรมการชอปปิงของตัวเอง",
+        "Social Media Influence - การแนะนำจากอินฟลูเอนเซอร์",
+        "In-App Purchases - การซื้อผ่านแอปพลิเคชัน",
+        "Subscription Models - ชอบการซื้อสินค้าผ่านการมีบัตรสมาชิก",
+    ], False),
+    "best_time_to_buy": (["มกราคม - มีนาคม", "เมษายน - มิถุนายน", "กรกฎาคม - กันยายน",
+                          "ตุลาคม - ธันวาคม"], True),
+    "preferred_destination": (["ทะเล", "ภูเขา", "น้ำตก", "ต่างประเทศ"], False),
+    "know_tpartner": (["ไม่รู้จักมาก่อนเลย", "เคยเห็นผ่านตา แต่ไม่แน่ใจว่าแบรนด์ทำอะไร",
+                       "รู้จัก และรู้ว่าเป็นแบรนด์กระเป๋าเดินทาง"], True),
+    "tpartner_positioning": ([
+        "Budget Friendly (เน้นราคาถูก ใช้งานสั้น / ใช้ครั้งคราว)",
+        "Mid-range Smart Buy (ดีไซน์ทันสมัย + ฟังก์ชันครบ + ราคาเข้าถึงได้)",
+        "Affordable Premium (คุณภาพดี + ดีไซน์ + ราคาสมเหตุสมผล)",
+        "Premium Luxury (ทน หรูหรา)",
+    ], False),
+    "tpartner_memorable_factor": (["โลโก้หรือชื่อแบรนด์", "ดีไซน์กระเป๋า", "Content ทุบ เหยียบกระเป๋า",
+                                   "Influencer / Presenter", "คอนเทนต์ไลฟ์สไตล์", "Live stream",
+                                   "โปรโมชั่นหรือราคา", "รีวิวจากผู้ใช้จริง"], False),
+    "considered_tpartner": (["ไม่เคยคิดจะซื้อ", "เคยสนใจ แต่ยังไม่เคยซื้อ", "เคย และซื้อแล้ว"], True),
+    "communication_preference": (["รีวิวจากผู้ใช้จริง", "ราคาไม่แพงและคุณภาพดี",
+                                  "มีฟังก์ชั่นเหมาะกับคนรุ่นใหม่ / นักเดินทาง", "ดีไซน์เท่ / ทันสมัย",
+                                  "แบรนด์ดูน่าเชื่อถือ / มีรางวัล", "Influencer ที่น่าสนใจ",
+                                  "คอนเทนต์ที่ดูแล้ว “อยากเที่ยว”"], False),
+    "interest_in_tote_bag": (["สนใจ", "ไม่สนใจ"], False),
+    "luggage_count_per_trip": (["1 ใบ", "2 - 3 ใบ", "4 - 5 ใบ"], True),
+    "travel_companion": (["คนเดียว", "คู่รัก", "เพื่อน", "ครอบครัว"], False),
+    "decision_maker": (["ฉันเลือกเองและจ่ายเงินเอง", "ฉันเลือกเอง แต่คนอื่นเป็นคนจ่าย (เช่น พ่อแม่ / แฟน)",
+                        "คนในครอบครัวเลือกและซื้อให้", "เพื่อน/คนใกล้ตัวแนะนำหรือซื้อให้"], False),
+}
+
+def apply_category_schema(df, schema=CATEGORY_SCHEMA):
+    """Convert closed-choice answer columns to categoricals with a stable category order"""
+    for col in df.columns:
+        spec = schema.get(col)
+        if spec is None:
+            continue
+        categories, ordered = spec
+        extra = sorted(set(df[col].dropna().unique()) - set(categories))
+        df[col] = pd.Categorical(df[col], categories=list(categories) + extra, ordered=ordered)
+    return df
+
+def parse_range_labels(series):
+    """Parse range labels such as "15,001 - 20,000 บาท" into low/high/midpoint columns"""
+    # Survey range columns only hold a handful of labels, so parse each distinct label once
+    codes, labels = pd.factorize(series)
+    
+    # One extra NaN row at the end so missing values (code -1) broadcast to NaN
+    bounds = np.full((len(labels) + 1, 3), np.nan)
+    for i, label in enumerate(labels):
+        nums = list(map(int, re.findall(r"\d+", str(label).replace(",", ""))))
+        if nums:
+            bounds[i] = (min(nums), max(nums), np.mean(nums))
+    
+    return pd.DataFrame(bounds[codes], index=series.index, columns=["low", "high", "mid"])
+
+def likert_columns(df):
+    """Likert-scale item columns (filled with medians during cleaning)"""
+    return [c for c in df.columns if re.match(r"(factor|price|channel|promo)_", c)]
+
+# Survey schema: column roles are resolved once per column layout instead of being rescanned
+# by every page on every rerun
+LIKERT_BLOCKS = ("factor", "price", "channel", "promo")
+LIKERT_SCALE = (1, 2, 3, 4, 5)
+DEMOGRAPHIC_COLUMNS = ["gender", "age", "age_group", "occupation", "monthly_income", "income_group"]
+DERIVED_COLUMNS = ["income_min", "income_max", "income_mid", "price_min", "price_max", "price_midpoint"]
+GROUPING_COLUMNS = ["age_group", "income_group", "wave"]
+MULTISELECT_COLUMNS = ["known_brands", "current_brands", "reason_to_buy", "important_factors",
+                       "preferred_styles", "purchase_channels", "used_bag_types", "accessory_purchase"]
+FREE_TEXT_COLUMNS = ["first_impression", "reason_not_chosen", "reason_for_tote_bag_answer",
+                     "preferred_presenter", "preferred_collab_brand"]
+PII_COLUMNS = ["email"]
+
+# Thai labels for Likert items; other items get a title-cased label from the column name
+LIKERT_DISPLAY_NAMES = {
+    'price_within_budget': 'อยู่ในงบประมาณ',
+    'price_value_for_quality': 'คุ้มค่าต่อคุณภาพ',
+    'price_vs_competitor': 'เทียบกับคู่แข่ง',
+    'price_image_boost': 'เพิ่มภาพลักษณ์'
+}
+
+def canonical_column_name(name):
+    """Canonical form of a raw export column name"""
+    return str(name).strip()
+
+def likert_display_name(col):
+    """Readable label for a Likert item column"""
+    if col in LIKERT_DISPLAY_NAMES:
+        return LIKERT_DISPLAY_NAMES[col]
+    return col.split("_", 1)[-1].replace("_", " ").title()
+
+@dataclass(frozen=True)
+class SurveySchema:
+    """Column roles of a cleaned survey frame"""
+    columns: tuple
+    demographic: tuple
+    likert_blocks: dict
+    likert_scale: tuple
+    multiselect: tuple
+    free_text: tuple
+    pii: tuple
+    derived: tuple
+    display_names: dict
+    
+    @property
+    def likert(self):
+        """All Likert item columns, block by block"""
+        return [c for block in self.likert_blocks.values() for c in block]
+    
+    @property
+    def questions(self):
+        """Survey question columns (answers from the export, not derived or grouping columns)"""
+        return [c for c in self.columns if c not in DERIVED_COLUMNS and c not in GROUPING_COLUMNS]
+    
+    def block(self, name):
+        """Item columns of one Likert block (factor, price, channel or promo)"""
+        return list(self.likert_blocks.get(name, ()))
+    
+    def resolve(self, name):
+        """Canonical column for a (possibly raw) column name, or None if the frame lacks it"""
+        name = canonical_column_name(name)
+        return name if name in self.columns else None
+    
+    def display_name(self, col):
+        """Display label for a column"""
+        return self.display_names.get(col, col)
+
+@lru_cache(maxsize=16)
+def _build_survey_schema(columns):
+    """Classify a column layout into survey roles"""
+    present = set(columns)
+    likert_blocks = {
+        block: tuple(c for c in columns if c.startswith(f"{block}_") and c not in DERIVED_COLUMNS)
+        for block in LIKERT_BLOCKS
+    }
+    return SurveySchema(
+        columns=columns,
+        demographic=tuple(c for c in DEMOGRAPHIC_COLUMNS if c in present),
+        likert_blocks=likert_blocks,
+        likert_scale=LIKERT_SCALE,
+        multiselect=tuple(c for c in MULTISELECT_COLUMNS if c in present),
+        free_text=tuple(c for c in FREE_TEXT_COLUMNS if c in present),
+        pii=tuple(c for c in PII_COLUMNS if c in present),
+        derived=tuple(c for c in DERIVED_COLUMNS if c in present),
+        display_names={c: likert_display_name(c) for block in likert_blocks.values() for c in block},
+    )
+
+def get_survey_schema(df):
+    """Survey schema of a frame (built once per column layout)"""
+    return _build_survey_schema(tuple(df.columns))
+
+def clean_survey_chunk(df):
+    """Apply the row-local cleaning steps; safe to run on any slice of the raw file"""
+    # Canonical column names (the export carries stray trailing spaces, e.g. 'preferred_price_range ')
+    df = df.rename(columns=canonical_column_name)
+    
+    # Clean data similar to notebook
+    df = df.dropna(subset=["gender", "age", "monthly_income"]).reset_index(drop=True)
+    df["age"] = df["age"].astype(int)
+    
+    # Income and price range bounds (parsed once per distinct label)
+    income_bounds = parse_range_labels(df["monthly_income"])
+    df["income_min"] = income_bounds["low"]
+    df["income_max"] = income_bounds["high"]
+    df["income_mid"] = income_bounds["mid"]
+    
+    if "preferred_price_range" in df.columns:
+        price_bounds = parse_range_labels(df["preferred_price_range"])
+        df["price_min"] = price_bounds["low"]
+        df["price_max"] = price_bounds["high"]
+        df["price_midpoint"] = price_bounds["mid"]
+    
+    # Create age and income groups
+    df["age_group"] = pd.cut(
+        df["age"], bins=[0,17,24,34,44,150],
+        labels=["<18","18-24","25-34","35-44","45+"]
+    )
+    df["income_group"] = pd.cut(
+        df["income_mid"], bins=[0,15000,30000,50000,1e9],
+        labels=["<15k","15-30k","30-50k","50k+"]
+    )
+    
+    # Remove rows with NaN income_group (high income groups with no data)
+    df = df.dropna(subset=['income_group']).reset_index(drop=True)
+    
+    # Low-cardinality answers as categoricals so page aggregations run on integer codes
+    df = apply_category_schema(df)
+    
+    return df
+
+def fill_likert_medians(df, medians):
+    """Fill missing Likert answers with the given (global) medians"""
+    for col in likert_columns(df):
+        if col in medians:
+            df[col] = df[col].fillna(medians[col])
+    return df
+
+def concat_survey_frames(frames):
+    """Concatenate cleaned frames, unioning categories so categoricals don't fall back to object"""
+    frames = [f for f in frames if len(f) > 0] or frames[:1]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    
+    frames = [f.copy(deep=False) for f in frames]
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+        # Schema options first, then every other answer sorted (as apply_category_schema does), so
+        # the codes don't depend on how the rows were split into chunks, appends or waves
+        known = list(CATEGORY_SCHEMA[col][0]) if col in CATEGORY_SCHEMA else list(frames[0][col].cat.categories)
+        seen = set(c for f in frames if col in f.columns for c in f[col].astype("category").cat.categories)
+        categories = known + sorted(seen - set(known))
+        ordered = frames[0][col].cat.ordered
+        for f in frames:
+            if col in f.columns:
+                f[col] = pd.Categorical(f[col], categories=categories, ordered=ordered)
+    
+    return pd.concat(frames, ignore_index=True)
+
+# Streaming ingestion for exports too large to read_csv in one go. Only parsing and cleaning are
+# bounded (by one chunk); the cleaned frame is still assembled once and served from memory, so the
+# resident size grows with the cleaned data (categoricals and numeric columns, far below the CSV)
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+STREAMING_CHUNK_ROWS = 100_000
+
+def new_ingest_aggregates():
+    """Empty running aggregates for chunked ingestion"""
+    return {"rows": 0, "likert_counts": {}, "category_counts": {}}
+
+def _fold_counts(target, counts):
+    """Add a value_counts result into a {value: count} dict"""
+    for value, count in counts.items():
+        target[value] = target.get(value, 0) + int(count)
+
+def update_ingest_aggregates(aggregates, chunk):
+    """Fold one cleaned (unfilled) chunk into the running aggregates"""
+    aggregates["rows"] += len(chunk)
+    
+    # Likert items only take a few distinct values, so value histograms give exact global medians
+    for col in likert_columns(chunk):
+        counts = chunk[col].value_counts(dropna=True)
+        _fold_counts(aggregates["likert_counts"].setdefault(col, {}), counts)
+    
+    for col in chunk.columns:
+        if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+            counts = chunk[col].value_counts(dropna=True)
+            _fold_counts(aggregates["category_counts"].setdefault(col, {}), counts[counts > 0])
+    
+    return aggregates
+
+def median_from_counts(counts):
+    """Exact median of a {value: count} histogram (same convention as Series.median)"""
+    if not counts:
+        return np.nan
+    values = np.array(sorted(counts), dtype=float)
+    cumulative = np.cumsum([counts[v] for v in sorted(counts)])
+    n = cumulative[-1]
+    lower = values[np.searchsorted(cumulative, (n - 1) // 2, side="right")]
+    upper = values[np.searchsorted(cumulative, n // 2, side="right")]
+    return (lower + upper) / 2
+
+def likert_medians_from_aggregates(aggregates):
+    """Global Likert medians from the running histograms"""
+    return {col: median_from_counts(counts) for col, counts in aggregates["likert_counts"].items()}
+
+def ingest_csv_streaming(source_path, store_dir, chunk_rows=STREAMING_CHUNK_ROWS):
+    """Clean a CSV chunk by chunk into a Parquet part store; the raw CSV is never held beyond one chunk"""
+    os.makedirs(store_dir, exist_ok=True)
+    aggregates = new_ingest_aggregates()
+    
+    for i, chunk in enumerate(pd.read_csv(source_path, chunksize=chunk_rows)):
+        chunk = clean_survey_chunk(chunk)
+        update_ingest_aggregates(aggregates, chunk)
+        # Likert gaps stay missing in the parts; global medians are only known after the last chunk
+        chunk.to_parquet(os.path.join(store_dir, f"part-{i:05d}.parquet"), index=False)
+    
+    aggregates["likert_medians"] = likert_medians_from_aggregates(aggregates)
+    with open(os.path.join(store_dir, "aggregates.json"), "w", encoding="utf-8") as f:
+        json.dump(aggregates_to_json(aggregates), f, ensure_ascii=False)
+    
+    return aggregates
+
+def aggregates_to_json(aggregates):
+    """JSON-safe copy of the running aggregates (histogram keys become [value, count] pairs)"""
+    return {
+        "rows": aggregates["rows"],
+        "likert_counts": {col: [[float(v), c] for v, c in counts.items()]
+                          for col, counts in aggregates["likert_counts"].items()},
+        "category_counts": {col: [[str(v), c] for v, c in counts.items()]
+                            for col, counts in aggregates["category_counts"].items()},
+        "likert_medians": {col: float(m) for col, m in aggregates.get("likert_medians", {}).items()},
+    }
+
+def aggregates_from_json(data):
+    """Inverse of aggregates_to_json"""
+    return {
+        "rows": data["rows"],
+        "likert_counts": {col: {v: c for v, c in pairs} for col, pairs in data["likert_counts"].items()},
+        "category_counts": {col: {v: c for v, c in pairs} for col, pairs in data["category_counts"].items()},
+        "likert_medians": dict(data.get("likert_medians", {})),
+    }
+
+def read_part_store(store_dir):
+    """Assemble the part store written by ingest_csv_streaming; returns (frame, aggregates, imputed mask)"""
+    with open(os.path.join(store_dir, "aggregates.json"), encoding="utf-8") as f:
+        aggregates = aggregates_from_json(json.load(f))
+    
+    parts = [os.path.join(store_dir, p) for p in sorted(os.listdir(store_dir)) if p.endswith(".parquet")]
+    
+    # One column at a time across all parts, so peak memory is the assembled frame plus one column;
+    # Likert gaps are flagged and filled with the global medians as each column is assembled
+    columns = {}
+    imputed = {}
+    for col in pq.read_schema(parts[0]).names:
+        series = concat_survey_frames([pd.read_parquet(p, columns=[col]) for p in parts])[col]
+        if col in aggregates["likert_medians"]:
+            imputed[col] = series.isna().to_numpy()
+            series = series.fillna(aggregates["likert_medians"][col])
+        columns[col] = series
+    df = pd.DataFrame(columns, copy=False)
+    return df, aggregates, pd.DataFrame(imputed, index=df.index, copy=False)
+
+def likert_imputed_mask(df):
+    """Cells of the Likert columns that are missing before the median fill"""
+    return df[likert_columns(df)].isna()
+
+def imputed_mask_path(snapshot_file):
+    """Sidecar .npy file flagging a snapshot's median-filled cells (its columns are in the manifest)"""
+    return snapshot_file[:-len(".parquet")] + ".imputed.npy"
+
+def write_imputed_mask(snapshot_file, imputed):
+    """Persist the imputed-cell mask next to its snapshot"""
+    path = imputed_mask_path(snapshot_file)
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, imputed.to_numpy(dtype=bool))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing imputed mask {path}: {e}")
+
+def read_imputed_mask(snapshot_file, manifest):
+    """Memory-map a snapshot's imputed-cell mask, or None if it is missing or stale"""
+    columns = manifest.get("imputed_columns")
+    if columns is None:
+        return None
+    try:
+        mask = np.load(imputed_mask_path(snapshot_file), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if mask.ndim != 2 or mask.shape[1] != len(columns):
+        return None
+    return pd.DataFrame(mask, columns=columns, copy=False)
+
+def manifest_path(snapshot_file):
+    """Sidecar manifest describing which source bytes a snapshot was built from"""
+    return snapshot_file[:-len(".parquet")] + ".json"
+
+def write_manifest(snapshot_file, manifest):
+    """Persist a snapshot manifest next to its snapshot"""
+    if not SNAPSHOT_AVAILABLE:
+        return
+    path = manifest_path(snapshot_file)
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing snapshot manifest {path}: {e}")
+
+def ingest_full(source_path, source_hash):
+    """Clean a whole source file; returns the cleaned frame, its snapshot manifest and imputed mask"""
+    if os.path.getsize(source_path) > STREAMING_THRESHOLD_BYTES and SNAPSHOT_AVAILABLE:
+        # Very large exports: stream into a part store instead of materializing the raw CSV
+        store_dir = snapshot_path(source_path, source_hash)[:-len(".parquet")] + ".parts"
+        ingest_csv_streaming(source_path, store_dir)
+        df, aggregates, imputed = read_part_store(store_dir)
+    else:
+        df = clean_survey_chunk(pd.read_csv(source_path))
+        aggregates = update_ingest_aggregates(new_ingest_aggregates(), df)
+        aggregates["likert_medians"] = likert_medians_from_aggregates(aggregates)
+        imputed = likert_imputed_mask(df)
         
         # Fill missing values for Likert scale columns
-        likert_cols = [c for c in df.columns if re.match(r"(factor|price|channel|promo)_", c)]
-        for col in likert_cols:
-            df[col] = df[col].fillna(df[col].median())
-        
-        # Create age and income groups
-        df["age_group"] = pd.cut(
-            df["age"], bins=[0,17,24,34,44,150],
-            labels=["<18","18-24","25-34","35-44","45+"]
-        )
-        df["income_group"] = pd.cut(
-            df["income_mid"], bins=[0,15000,30000,50000,1e9],
-            labels=["<15k","15-30k","30-50k","50k+"]
-        )
-        
-        # Remove rows with NaN income_group (high income groups with no data)
-        df = df.dropna(subset=['income_group']).reset_index(drop=True)
+        df = fill_likert_medians(df, aggregates["likert_medians"])
+    
+    manifest = {
+        "source_size": os.path.getsize(source_path),
+        "source_hash": source_hash,
+        "aggregates": aggregates_to_json(aggregates),
+        "imputed_columns": list(imputed.columns),
+    }
+    return df, manifest, imputed
+
+# Snapshots kept per source file; each append writes a new one, so older ones are pruned
+SNAPSHOT_KEEP_PER_SOURCE = 3
+
+def prune_snapshots(source_path, keep=SNAPSHOT_KEEP_PER_SOURCE):
+    """Delete all but the newest `keep` snapshots (with their sidecars) of a source file"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    pattern = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{16}}-v\d+\.parquet")
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    snapshots = [os.path.join(SNAPSHOT_DIR, name) for name in os.listdir(SNAPSHOT_DIR) if pattern.fullmatch(name)]
+    snapshots.sort(key=os.path.getmtime, reverse=True)
+    
+    for snapshot_file in snapshots[keep:]:
+        stem_path = snapshot_file[:-len(".parquet")]
+        sidecars = [snapshot_file, manifest_path(snapshot_file), imputed_mask_path(snapshot_file),
+                    *likert_matrix_paths(snapshot_file)]
+        try:
+            for path in sidecars:
+                if os.path.exists(path):
+                    os.remove(path)
+            if os.path.isdir(f"{stem_path}.parts"):
+                shutil.rmtree(f"{stem_path}.parts")
+        except OSError as e:
+            print(f"Error pruning snapshot {snapshot_file}: {e}")
+
+def find_append_base(source_path, source_size):
+    """Newest snapshot whose source bytes are an unchanged prefix of the current file"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    suffix = f"-v{CLEANING_VERSION}.json"
+    candidates = []
+    if os.path.isdir(SNAPSHOT_DIR):
+        for name in os.listdir(SNAPSHOT_DIR):
+            if name.startswith(f"{stem}-") and name.endswith(suffix):
+                try:
+                    with open(os.path.join(SNAPSHOT_DIR, name), encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except Exception:
+                    continue
+                if manifest.get("source_size", 0) < source_size:
+                    candidates.append((manifest["source_size"], name, manifest))
+    
+    for size, name, manifest in sorted(candidates, key=lambda c: c[0], reverse=True):
+        # Appends only: the old content must be intact and end on a row boundary
+        with open(source_path, "rb") as f:
+            f.seek(size - 1)
+            ends_on_newline = f.read(1) == b"\n"
+        if ends_on_newline and compute_file_hash(source_path, limit=size) == manifest["source_hash"]:
+            return os.path.join(SNAPSHOT_DIR, name[:-len(".json")] + ".parquet"), manifest
+    return None
+
+def ingest_appended_rows(source_path, source_hash):
+    """Clean only the rows appended since an earlier snapshot and merge them in, or None"""
+    base = find_append_base(source_path, os.path.getsize(source_path))
+    if base is None:
+        return None
+    base_file, manifest = base
+    base_df = read_snapshot(base_file)
+    # Without the old rows' imputed mask their fills can't follow the updated medians
+    base_imputed = read_imputed_mask(base_file, manifest)
+    if base_df is None or base_imputed is None or len(base_imputed) != len(base_df):
+        return None
+    
+    header = list(pd.read_csv(source_path, nrows=0).columns)
+    with open(source_path, "rb") as f:
+        f.seek(manifest["source_size"])
+        delta_bytes = f.read()
+    if not delta_bytes.strip():
+        delta = base_df.iloc[0:0]
+    else:
+        delta = clean_survey_chunk(pd.read_csv(io.BytesIO(delta_bytes), header=None, names=header))
+    
+    # Fold the new rows into the stored aggregates; the global medians can move
+    aggregates = aggregates_from_json(manifest["aggregates"])
+    update_ingest_aggregates(aggregates, delta)
+    aggregates["likert_medians"] = likert_medians_from_aggregates(aggregates)
+    
+    imputed = pd.concat([base_imputed, likert_imputed_mask(delta)], ignore_index=True)
+    
+    df = concat_survey_frames([base_df, delta])
+    # Re-fill every originally missing answer (old rows included) with the updated medians
+    for col in imputed.columns:
+        rows = np.flatnonzero(imputed[col].to_numpy())
+        if len(rows) and col in df.columns:
+            df.loc[rows, col] = aggregates["likert_medians"][col]
+    
+    manifest = {
+        "source_size": os.path.getsize(source_path),
+        "source_hash": source_hash,
+        "aggregates": aggregates_to_json(aggregates),
+        "imputed_columns": list(imputed.columns),
+    }
+    return df, manifest, imputed
+
+# Likert answers as one contiguous int8 respondent x item matrix. Answers are stored in half
+# points (answer * 2) so imputed medians such as 3.5 stay exact; `missing` flags imputed cells
+# and 0 marks cells with no value at all (nothing to impute from), which reductions skip.
+LIKERT_HALF_POINTS = 2
+
+@dataclass
+class LikertMatrix:
+    """Respondent x item Likert answers with a missing-answer mask"""
+    columns: tuple
+    values: np.ndarray
+    missing: np.ndarray
+    
+    def _positions(self, cols):
+        if cols is None:
+            return list(self.columns), list(range(len(self.columns)))
+        lookup = {c: i for i, c in enumerate(self.columns)}
+        return list(cols), [lookup[c] for c in cols]
+    
+    def _present(self, idx, impute):
+        present = self.values[:, idx] != 0
+        return present if impute else present & ~self.missing[:, idx]
+    
+    def take(self, rows):
+        """Matrix restricted to the given row positions"""
+        return LikertMatrix(self.columns, self.values[rows], self.missing[rows])
+    
+    def level_counts(self, cols=None, answered_only=True):
+        """Answer counts per item and half-point level (items x levels)"""
+        cols, idx = self._positions(cols)
+        width = max(LIKERT_SCALE) * LIKERT_HALF_POINTS + 1
+        codes = self.values[:, idx].astype(np.int64) + np.arange(len(idx)) * width
+        codes = codes[self._present(idx, impute=not answered_only)]
+        return np.bincount(codes, minlength=len(idx) * width).reshape(len(idx), width)
+    
+    def mean(self, cols=None, impute=True):
+        """Per-item mean; imputed answers are included unless impute=False"""
+        cols, idx = self._positions(cols)
+        present = self._present(idx, impute)
+        sums = np.where(present, self.values[:, idx], 0).sum(axis=0, dtype=np.int64)
+        counts = present.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / (counts * LIKERT_HALF_POINTS)
+        return pd.Series(means, index=cols)
+    
+    def median(self, cols=None, impute=True):
+        """Per-item median from the level counts"""
+        cols, idx = self._positions(cols)
+        counts = self.level_counts(cols, answered_only=not impute)
+        cumulative = counts.cumsum(axis=1)
+        total = cumulative[:, -1]
+        low = (cumulative > ((total - 1) // 2)[:, None]).argmax(axis=1)
+        high = (cumulative > (total // 2)[:, None]).argmax(axis=1)
+        medians = np.where(total > 0, (low + high) / (2 * LIKERT_HALF_POINTS), np.nan)
+        return pd.Series(medians, index=cols)
+    
+    def distribution(self, cols=None, normalize=False):
+        """Answered counts (or shares) per item and scale point"""
+        cols, idx = self._positions(cols)
+        counts = self.level_counts(cols)[:, [level * LIKERT_HALF_POINTS for level in LIKERT_SCALE]]
+        dist = pd.DataFrame(counts, index=cols, columns=list(LIKERT_SCALE))
+        if normalize:
+            dist = dist.div(dist.sum(axis=1).replace(0, np.nan), axis=0)
+        return dist
+
+def build_likert_matrix(df, imputed=None):
+    """Build the Likert matrix of a cleaned frame; `imputed` flags median-filled answers"""
+    columns = tuple(get_survey_schema(df).likert)
+    filled = df[list(columns)].to_numpy(dtype=np.float64)
+    missing = np.isnan(filled)
+    for j, col in enumerate(columns):
+        if imputed is not None and col in imputed.columns:
+            missing[:, j] |= imputed[col].to_numpy(dtype=bool)
+    values = np.rint(np.nan_to_num(filled) * LIKERT_HALF_POINTS).astype(np.int8)
+    return LikertMatrix(columns, np.ascontiguousarray(values), missing)
+
+def likert_matrix_paths(snapshot_file):
+    """Sidecar .npy files (values, mask) holding a snapshot's Likert matrix"""
+    stem = snapshot_file[:-len(".parquet")]
+    return f"{stem}.likert.npy", f"{stem}.likert-missing.npy"
+
+def write_likert_matrix(snapshot_file, matrix):
+    """Persist a Likert matrix next to its snapshot"""
+    for path, array in zip(likert_matrix_paths(snapshot_file), (matrix.values, matrix.missing)):
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing Likert matrix {path}: {e}")
+
+def read_likert_matrix(snapshot_file, columns):
+    """Memory-map a snapshot's Likert matrix, or None if it is missing or stale"""
+    try:
+        values, missing = (np.load(path, mmap_mode="r") for path in likert_matrix_paths(snapshot_file))
+    except (OSError, ValueError):
+        return None
+    if values.shape != (values.shape[0], len(columns)) or missing.shape != values.shape:
+        return None
+    return LikertMatrix(tuple(columns), values, missing)
+
+def read_manifest(snapshot_file):
+    """Read a snapshot's manifest, or None"""
+    try:
+        with open(manifest_path(snapshot_file), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# Per-version caches are built from the full loaded frame only: filtered frames index into them
+# by base row positions, so a cache entry (re)built from a filtered frame would be misaligned
+BASE_FRAME_ENTRIES = 8
+
+@st.cache_resource
+def _base_frames():
+    """Most recent full loaded frame of each data version"""
+    return {"frames": OrderedDict(), "lock": threading.Lock()}
+
+def register_base_frame(df):
+    """Remember a full loaded frame so per-version caches can be rebuilt from it"""
+    registry = _base_frames()
+    with registry["lock"]:
+        registry["frames"][df.attrs["data_version"]] = df
+        registry["frames"].move_to_end(df.attrs["data_version"])
+        while len(registry["frames"]) > BASE_FRAME_ENTRIES:
+            registry["frames"].popitem(last=False)
+
+def is_base_frame(df):
+    """Whether a survey frame is a full loaded frame rather than a subset of one"""
+    return isinstance(df.index, pd.RangeIndex) and len(df) == df.attrs.get("base_rows")
+
+class StaleFrameError(Exception):
+    """Raised when a frame's data version can no longer be rebuilt from the sources on disk"""
+
+def get_base_frame(df):
+    """The full loaded frame a (possibly filtered) survey frame was taken from"""
+    if is_base_frame(df):
+        return df
+    registry = _base_frames()
+    with registry["lock"]:
+        base = registry["frames"].get(df.attrs["data_version"])
+    if base is None:
+        # Evicted: reassemble from the cached wave snapshots (without warming the caches being built)
+        base = assemble_waves(df.attrs["waves"], df.attrs["selected_waves"])
+        # A source changed since: its rows would not line up with this frame's row positions
+        if base is None or base.attrs["data_version"] != df.attrs["data_version"]:
+            raise StaleFrameError("ข้อมูลถูกอัปเดตแล้ว กรุณาโหลดหน้าใหม่")
+    return base
+
+@st.cache_resource(max_entries=8)
+def _likert_matrix_for_version(data_version, _df):
+    """Likert matrix of a full loaded frame (memory-mapped from the wave snapshots when possible)"""
+    _df = get_base_frame(_df)
+    columns = get_survey_schema(_df).likert
+    parts = [read_likert_matrix(path, columns) if path else None for path in _df.attrs.get("snapshots", [])]
+    if parts and all(part is not None for part in parts) and sum(len(p.values) for p in parts) == len(_df):
+        if len(parts) == 1:
+            return parts[0]
+        return LikertMatrix(tuple(columns), np.concatenate([p.values for p in parts]),
+                            np.concatenate([p.missing for p in parts]))
+    return build_likert_matrix(_df)
+
+def get_likert_matrix(df):
+    """Likert matrix rows for a (possibly filtered) survey frame"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return build_likert_matrix(df)
+    # Built once per data version by load_data; filtered frames keep base row positions as index
+    matrix = _likert_matrix_for_version(data_version, df)
+    if isinstance(df.index, pd.RangeIndex) and len(df) == len(matrix.values):
+        return matrix
+    return matrix.take(df.index.to_numpy())
+
+# Load and process data
+@st.cache_resource(max_entries=16)
+def load_wave(source_path, signature=None):
+    """Load and process one survey wave (shared, read-only)"""
+    # `signature` (size/mtime of the source) only keys the Streamlit cache so appended
+    # responses are picked up without a restart; a resource cache hands out the frame itself
+    # instead of unpickling another copy of it on every call
+    try:
+        source_hash = compute_file_hash(source_path)
+        path = snapshot_path(source_path, source_hash)
+        
+        # Cold starts and new replicas reuse the cleaned snapshot when the source is unchanged
+        df = read_snapshot(path)
+        if df is not None:
+            if read_likert_matrix(path, get_survey_schema(df).likert) is None:
+                imputed = read_imputed_mask(path, read_manifest(path) or {})
+                write_likert_matrix(path, build_likert_matrix(df, imputed))
+            df.attrs["snapshot"] = path
+            return df
+        
+        # Appended responses: parse only the new rows on top of the previous snapshot
+        result = ingest_appended_rows(source_path, source_hash) if SNAPSHOT_AVAILABLE else None
+        if result is None:
+            result = ingest_full(source_path, source_hash)
+        df, manifest, imputed = result
+        
+        write_snapshot(df, path)
+        write_manifest(path, manifest)
+        if SNAPSHOT_AVAILABLE:
+            write_imputed_mask(path, imputed)
+            write_likert_matrix(path, build_likert_matrix(df, imputed))
+            df.attrs["snapshot"] = path
+            prune_snapshots(source_path)
         
         return df
         
@@ -441,6 +1185,67 @@ def load_data():
         st.error("ไม่พบไฟล์ข้อมูล กรุณาตรวจสอบ path ของไฟล์")
         return None
 
+def discover_waves():
+    """Map wave name -> source CSV, oldest first"""
+    # One CSV per wave under data/waves/ (e.g. 2025Q1.csv); otherwise the single export is the only wave
+    if os.path.isdir(WAVES_DIR):
+        files = sorted(f for f in os.listdir(WAVES_DIR) if f.lower().endswith(".csv"))
+        if files:
+            return {os.path.splitext(f)[0]: os.path.join(WAVES_DIR, f) for f in files}
+    return {os.path.splitext(os.path.basename(DATA_PATH))[0]: DATA_PATH}
+
+@st.cache_resource(max_entries=4)
+def _assemble_waves(sources, all_waves):
+    """Concatenated frame of the given (name, path, signature) waves, shared across reruns"""
+    wave_names = [name for name, _ in all_waves]
+    frames = []
+    snapshots = []
+    for name, path, signature in sources:
+        wave_df = load_wave(path, signature)
+        if wave_df is None:
+            return None
+        snapshots.append(wave_df.attrs.get("snapshot"))
+        # assign() only adds the wave column; the cached wave's data is not copied
+        codes = np.full(len(wave_df), wave_names.index(name), dtype=np.int8)
+        frames.append(wave_df.assign(wave=pd.Categorical.from_codes(codes, categories=wave_names, ordered=True)))
+    if not frames:
+        return None
+    df = concat_survey_frames(frames)
+    
+    # Small, cheap-to-copy tags that key the per-version caches (Likert matrix etc.)
+    version_key = [(name, snapshot or signature) for (name, _, signature), snapshot in zip(sources, snapshots)]
+    df.attrs["data_version"] = hashlib.sha256(repr(version_key).encode()).hexdigest()[:16]
+    df.attrs["snapshots"] = snapshots
+    df.attrs["base_rows"] = len(df)
+    df.attrs["waves"] = dict(all_waves)
+    df.attrs["selected_waves"] = [name for name, _, _ in sources]
+    return df
+
+def assemble_waves(waves, selected=None):
+    """Concatenate the selected (cached) survey waves into one tagged frame"""
+    # Each wave is its own cached snapshot partition, so unselected waves are never read; the
+    # assembled frame is cached too, so a rerun with the same waves doesn't copy anything
+    selected = list(waves) if selected is None else selected
+    sources = tuple((name, waves[name], source_signature(waves[name])) for name in selected)
+    df = _assemble_waves(sources, tuple(waves.items()))
+    if df is not None:
+        register_base_frame(df)
+    return df
+
+def load_data(waves, selected=None):
+    """Load the selected survey waves into one frame"""
+    df = assemble_waves(waves, selected)
+    if df is None:
+        return None
+    
+    # Resolve column roles and the Likert matrix once; pages look them up instead of rescanning
+    get_survey_schema(df)
+    get_likert_matrix(df)
+    _multiselect_indexes_for_version(df.attrs["data_version"], df)
+    get_filter_index(df)
+    _likert_cube_for_version(df.attrs["data_version"], df)
+    return df
+
 # Data processing functions
 def normalize_th(text):
     """Normalize Thai text"""
@@ -450,24 +1255,1422 @@ def normalize_th(text):
     text = re.sub(r"\s+", " ", text).strip()
     return text.lower()
 
-def explode_multiselect(series, sep_pattern=r"[;,/|]", clean_func=None):
-    """Explode multi-select columns"""
-    exploded = (
-        series.fillna("")
-              .astype(str)
-              .str.replace(r"[\[\]\']", "", regex=True)
-              .str.replace(sep_pattern, ",", regex=True)
-              .str.split(",")
-              .explode()
-              .str.strip()
-              .replace("", pd.NA)
-              .dropna()
-    )
+def split_multiselect(text, sep_pattern=r"[;,/|]", clean_func=None):
+    """Split one multi-select answer into its options"""
+    text = re.sub(sep_pattern, ",", re.sub(r"[\[\]\']", "", text))
+    options = [part.strip() for part in text.split(",")]
+    options = [option for option in options if option]
     if clean_func:
-        exploded = exploded.apply(clean_func)
-    return exploded.to_frame(name="value")
+        options = [clean_func(option) for option in options]
+    return options
+
+@dataclass
+class MultiselectIndex:
+    """Respondent x option incidence matrix (CSR) of one multi-select column"""
+    column: str
+    options: pd.Index
+    incidence: sparse.csr_matrix
+    
+    def take(self, rows):
+        """Index restricted to the given row positions"""
+        return MultiselectIndex(self.column, self.options, self.incidence[rows])
+    
+    def counts(self):
+        """Mentions per option, most frequent first (like exploded value_counts)"""
+        counts = pd.Series(np.asarray(self.incidence.sum(axis=0)).ravel(), index=self.options, name="count")
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+def build_multiselect_index(series, sep_pattern=r"[;,/|]", clean_func=normalize_th):
+    """Parse a multi-select column once into a sparse incidence matrix"""
+    # Split each distinct answer once; rows then pick their answer's options via a sparse product
+    codes, labels = pd.factorize(series.fillna("").astype(str))
+    option_ids = {}
+    label_rows, label_cols = [], []
+    for i, label in enumerate(labels):
+        for option in split_multiselect(label, sep_pattern, clean_func):
+            label_rows.append(i)
+            label_cols.append(option_ids.setdefault(option, len(option_ids)))
+    
+    # Duplicate options within one answer are summed, as in the exploded value_counts
+    by_label = sparse.csr_matrix(
+        (np.ones(len(label_rows), dtype=np.int32), (label_rows, label_cols)),
+        shape=(len(labels), len(option_ids))
+    )
+    by_row = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (np.arange(len(codes)), codes)),
+        shape=(len(codes), len(labels))
+    )
+    return MultiselectIndex(series.name, pd.Index(list(option_ids), name="value"), (by_row @ by_label).tocsr())
+
+@st.cache_resource(max_entries=8)
+def _multiselect_indexes_for_version(data_version, _df):
+    """Incidence matrices of every multi-select column of a full loaded frame"""
+    _df = get_base_frame(_df)
+    return {col: build_multiselect_index(_df[col]) for col in get_survey_schema(_df).multiselect}
+
+def get_multiselect_index(df, col):
+    """Incidence matrix rows of a multi-select column for a (possibly filtered) survey frame"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return build_multiselect_index(df[col])
+    # Built once per data version by load_data; filtered frames keep base row positions as index
+    index = _multiselect_indexes_for_version(data_version, df)[col]
+    if isinstance(df.index, pd.RangeIndex) and len(df) == index.incidence.shape[0]:
+        return index
+    return index.take(df.index.to_numpy())
+
+# Global respondent filter: one packed bitmap per (column, value), so combining predicates is a
+# bitwise OR within a column and a bitwise AND across columns
+FILTER_COLUMNS = {
+    "gender": "เพศ",
+    "age_group": "กลุ่มอายุ",
+    "income_group": "กลุ่มรายได้",
+    "occupation": "อาชีพ",
+}
+
+@dataclass
+class FilterIndex:
+    """Packed per-value respondent bitmaps of a full loaded frame"""
+    n_rows: int
+    bitmaps: dict
+    options: dict
+    
+    def select(self, spec):
+        """Row positions matching a filter spec {column: [values]}"""
+        selected = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for col, values in spec.items():
+            column_bits = np.zeros_like(selected)
+            for value in values:
+                bits = self.bitmaps.get((col, value))
+                if bits is not None:
+                    np.bitwise_or(column_bits, bits, out=column_bits)
+            np.bitwise_and(selected, column_bits, out=selected)
+        return np.flatnonzero(np.unpackbits(selected, count=self.n_rows))
+
+def build_filter_index(df):
+    """Precompute the respondent bitmaps for every filterable value"""
+    bitmaps, options = {}, {}
+    for col in list(FILTER_COLUMNS) + ["wave"]:
+        if col not in df.columns:
+            continue
+        values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+        codes = values.cat.codes.to_numpy()
+        options[col] = []
+        for code, value in enumerate(values.cat.categories):
+            mask = codes == code
+            if mask.any():
+                bitmaps[(col, value)] = np.packbits(mask)
+                options[col].append(value)
+    
+    # Multi-select options: a respondent matches if they ticked the option
+    for col in get_survey_schema(df).multiselect:
+        index = get_multiselect_index(df, col)
+        chosen = index.incidence.tocsc()
+        for j, option in enumerate(index.options):
+            mask = np.zeros(len(df), dtype=bool)
+            mask[chosen.indices[chosen.indptr[j]:chosen.indptr[j + 1]]] = True
+            bitmaps[(col, option)] = np.packbits(mask)
+        options[col] = list(index.counts().index)
+    
+    return FilterIndex(len(df), bitmaps, options)
+
+@st.cache_resource(max_entries=8)
+def _filter_index_for_version(data_version, _df):
+    """Filter bitmaps of a full loaded frame"""
+    return build_filter_index(get_base_frame(_df))
+
+def get_filter_index(df):
+    """Filter bitmaps for a full loaded survey frame"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return build_filter_index(df)
+    return _filter_index_for_version(data_version, df)
+
+def apply_respondent_filter(df, spec):
+    """Rows of a full loaded frame matching a filter spec; the index keeps base row positions"""
+    spec = {col: list(values) for col, values in spec.items() if values}
+    if not spec:
+        return df
+    filtered = df.iloc[get_filter_index(df).select(spec)]
+    filtered.attrs["selection"] = spec
+    filtered.attrs["selection_key"] = hashlib.sha256(
+        json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str).encode()
+    ).hexdigest()[:16]
+    return filtered
+
+def respondent_filter_sidebar(df):
+    """Sidebar widgets for the global respondent filter; returns the filter spec"""
+    index = get_filter_index(df)
+    spec = {}
+    with st.sidebar.expander("ตัวกรองผู้ตอบแบบสอบถาม"):
+        for col, label in FILTER_COLUMNS.items():
+            if index.options.get(col):
+                spec[col] = st.multiselect(label, index.options[col], key=f"filter_{col}")
+        
+        # Any multi-select answer option (e.g. respondents who buy on Shopee)
+        questions = [c for c in get_survey_schema(df).multiselect if index.options.get(c)]
+        question = st.selectbox("คำถามแบบเลือกได้หลายข้อ", ["ไม่กรอง"] + questions, key="filter_question")
+        if question != "ไม่กรอง":
+            spec[question] = st.multiselect("ตัวเลือกที่ตอบ", index.options[question], key=f"filter_{question}")
+    return spec
+
+# Likert aggregation cube: n, sum and sum of squares of every Likert item per observed
+# gender x age_group x income_group x occupation cell, so demographic breakdowns cost O(cells)
+CUBE_DIMENSIONS = ("gender", "age_group", "income_group", "occupation")
+
+@dataclass
+class LikertCube:
+    """Per-cell Likert sufficient statistics over the demographic dimensions"""
+    dimensions: tuple
+    categories: dict
+    cells: np.ndarray
+    rows: np.ndarray
+    columns: tuple
+    n: np.ndarray
+    sums: np.ndarray
+    sumsq: np.ndarray
+    
+    def _positions(self, cols):
+        if cols is None:
+            return list(self.columns), list(range(len(self.columns)))
+        lookup = {c: i for i, c in enumerate(self.columns)}
+        return list(cols), [lookup[c] for c in cols]
+    
+    def slice(self, **selection):
+        """Sub-cube of the cells whose dimension values are in the selected labels"""
+        keep = np.ones(len(self.cells), dtype=bool)
+        for dim, values in selection.items():
+            d = self.dimensions.index(dim)
+            codes = self.categories[dim].categories.get_indexer(list(values))
+            keep &= np.isin(self.cells[:, d], codes[codes >= 0])
+        return LikertCube(self.dimensions, self.categories, self.cells[keep], self.rows[keep],
+                          self.columns, self.n[keep], self.sums[keep], self.sumsq[keep])
+    
+    def rollup(self, by, cols=None):
+        """Cube statistics summed over every dimension not in `by` (cells with a missing `by` value dropped)"""
+        by = [by] if isinstance(by, str) else list(by)
+        cols, idx = self._positions(cols)
+        dims = [self.dimensions.index(dim) for dim in by]
+        keys = self.cells[:, dims]
+        valid = (keys >= 0).all(axis=1)
+        groups, inverse = np.unique(keys[valid], axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        
+        member = sparse.csr_matrix(
+            (np.ones(len(inverse)), (inverse, np.arange(len(inverse)))), shape=(len(groups), len(inverse))
+        )
+        stats = [member @ block[valid][:, idx] for block in (self.n, self.sums, self.sumsq)]
+        rows = member @ self.rows[valid]
+        return groups, rows, cols, stats
+    
+    def _index(self, by, groups):
+        by = [by] if isinstance(by, str) else list(by)
+        levels = []
+        for d, dim in enumerate(by):
+            dtype = self.categories[dim]
+            levels.append(pd.Categorical.from_codes(groups[:, d], dtype=dtype))
+        if len(by) == 1:
+            return pd.CategoricalIndex(levels[0], name=by[0])
+        return pd.MultiIndex.from_arrays(levels, names=by)
+    
+    def _frame(self, by, groups, values, cols, observed):
+        result = pd.DataFrame(values, index=self._index(by, groups), columns=cols)
+        if observed or not isinstance(by, str):
+            return result
+        full = self.categories[by].categories
+        return result.reindex(pd.CategoricalIndex(full, dtype=self.categories[by], name=by))
+    
+    def mean(self, by, cols=None, observed=True):
+        """Per-group item means, like df.groupby(by)[cols].mean()"""
+        groups, rows, cols, (n, sums, _) = self.rollup(by, cols)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / n
+        return self._frame(by, groups, means, cols, observed)
+    
+    def std(self, by, cols=None, ddof=1, observed=True):
+        """Per-group item standard deviations from the sums of squares"""
+        groups, rows, cols, (n, sums, sumsq) = self.rollup(by, cols)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = (sumsq - sums ** 2 / n) / (n - ddof)
+        return self._frame(by, groups, np.sqrt(np.clip(variance, 0, None)), cols, observed)
+    
+    def count(self, by, cols=None, observed=True):
+        """Per-group number of answers of each item"""
+        groups, rows, cols, (n, _, _) = self.rollup(by, cols)
+        return self._frame(by, groups, n.astype(np.int64), cols, observed)
+
+def build_likert_cube(df, matrix=None):
+    """Aggregate a frame's Likert answers into the demographic cube"""
+    matrix = get_likert_matrix(df) if matrix is None else matrix
+    dimensions = tuple(dim for dim in CUBE_DIMENSIONS if dim in df.columns)
+    categories = {}
+    codes = np.empty((len(df), len(dimensions)), dtype=np.int64)
+    for d, dim in enumerate(dimensions):
+        column = df[dim] if isinstance(df[dim].dtype, pd.CategoricalDtype) else df[dim].astype("category")
+        categories[dim] = column.dtype
+        codes[:, d] = column.cat.codes.to_numpy()
+    cells, inverse = np.unique(codes, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    
+    # Answers stored as half-points, 0 meaning no value
+    values = np.asarray(matrix.values, dtype=np.float64) / LIKERT_HALF_POINTS
+    present = (values != 0).astype(np.float64)
+    member = sparse.csr_matrix(
+        (np.ones(len(df)), (inverse, np.arange(len(df)))), shape=(len(cells), len(df))
+    )
+    return LikertCube(
+        dimensions=dimensions,
+        categories=categories,
+        cells=cells,
+        rows=np.bincount(inverse, minlength=len(cells)),
+        columns=tuple(matrix.columns),
+        n=member @ present,
+        sums=member @ values,
+        sumsq=member @ (values ** 2),
+    )
+
+@st.cache_resource(max_entries=8)
+def _likert_cube_for_version(data_version, _df):
+    """Likert cube of a full loaded frame, built once per data version"""
+    return build_likert_cube(get_base_frame(_df))
+
+@st.cache_resource(max_entries=16)
+def _likert_cube_for_selection(data_version, selection_key, _df):
+    """Likert cube of a filtered frame whose filter is not purely demographic"""
+    return build_likert_cube(_df)
+
+def get_likert_cube(df):
+    """Likert cube for a (possibly filtered) survey frame"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return build_likert_cube(df)
+    selection = df.attrs.get("selection")
+    if not selection:
+        return _likert_cube_for_version(data_version, df)
+    # Filters on the cube's own dimensions are answered by slicing cells, not rescanning rows
+    if set(selection) <= set(CUBE_DIMENSIONS):
+        return _likert_cube_for_version(data_version, df).slice(**selection)
+    return _likert_cube_for_selection(data_version, df.attrs.get("selection_key"), df)
+
+# Bootstrap confidence intervals for Likert means: each batch of resamples is one index matrix,
+# turned into per-resample respondent weights so all items' resampled means are one matrix product
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 20240601
+BOOTSTRAP_BATCH_CELLS = 4_000_000
+
+def bootstrap_likert_ci(matrix, cols=None, n_resamples=BOOTSTRAP_RESAMPLES, confidence=BOOTSTRAP_CONFIDENCE,
+                        seed=BOOTSTRAP_SEED):
+    """Percentile bootstrap confidence intervals of the item means (items x mean/low/high)"""
+    cols, idx = matrix._positions(cols)
+    # Answered cells only: median-imputed answers would narrow the intervals with synthetic data
+    present = (np.asarray(matrix.values[:, idx]) != 0) & ~np.asarray(matrix.missing[:, idx])
+    values = np.where(present, np.asarray(matrix.values[:, idx], dtype=np.float64) / LIKERT_HALF_POINTS, 0)
+    present = present.astype(np.float64)
+    n = len(values)
+    result = pd.DataFrame({"mean": matrix.mean(cols, impute=False).to_numpy(), "low": np.nan, "high": np.nan},
+                          index=cols)
+    if n == 0 or not cols:
+        return result
+    
+    rng = np.random.default_rng(seed)
+    means = np.empty((n_resamples, len(idx)))
+    batch = max(1, BOOTSTRAP_BATCH_CELLS // n)
+    for start in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - start)
+        resample_rows = rng.integers(0, n, size=(size, n))
+        # How many times each respondent is drawn in each resample
+        offsets = np.arange(size)[:, None] * n
+        weights = np.bincount((resample_rows + offsets).ravel(), minlength=size * n).reshape(size, n)
+        weights = weights.astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[start:start + size] = (weights @ values) / (weights @ present)
+    
+    alpha = (1 - confidence) / 2
+    answered = ~np.isnan(means).all(axis=0)
+    if answered.any():
+        bounds = np.nanquantile(means[:, answered], [alpha, 1 - alpha], axis=0)
+        result.loc[result.index[answered], "low"] = bounds[0]
+        result.loc[result.index[answered], "high"] = bounds[1]
+    return result
+
+@st.cache_data(max_entries=32)
+def _cached_likert_ci(data_version, selection_key, _df):
+    """Bootstrap intervals of every Likert item, memoized per (data version, filter selection)"""
+    return bootstrap_likert_ci(get_likert_matrix(_df))
+
+def get_likert_ci(df, cols):
+    """Bootstrap confidence intervals of the given Likert items' means"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return bootstrap_likert_ci(get_likert_matrix(df), list(cols))
+    return _cached_likert_ci(data_version, df.attrs.get("selection_key", ""), df).loc[list(cols)]
+
+def ci_error_bars(means, ci):
+    """Plotly error_x / error_x_minus arrays for answered-only means with their confidence intervals"""
+    return dict(error_x=(ci["high"] - means).to_numpy(), error_x_minus=(means - ci["low"]).to_numpy())
+
+# Significance of demographic differences: per demographic, one (group x item x level) count tensor
+# gives every item's Kruskal-Wallis and chi-square statistics at once; q-values are Benjamini-Hochberg
+SIGNIFICANCE_LEVELS = ((0.001, "***"), (0.01, "**"), (0.05, "*"))
+SIGNIFICANCE_NOTE = "* q < 0.05, ** q < 0.01, *** q < 0.001 (Kruskal-Wallis ปรับค่าด้วย Benjamini-Hochberg)"
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg adjusted p-values (q-values); NaN entries are left out of the family"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    q_values = np.full(p_values.shape, np.nan)
+    valid = ~np.isnan(p_values)
+    m = int(valid.sum())
+    if m == 0:
+        return q_values
+    
+    order = np.argsort(p_values[valid])
+    ranked = p_values[valid][order] * m / np.arange(1, m + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    adjusted = np.empty(m)
+    adjusted[order] = np.minimum(ranked, 1)
+    q_values[valid] = adjusted
+    return q_values
+
+def _group_level_tests(counts):
+    """Kruskal-Wallis and chi-square statistics per item from (groups x items x levels) answer counts"""
+    counts = counts.astype(np.float64)
+    group_n = counts.sum(axis=2)
+    level_n = counts.sum(axis=0)
+    n = level_n.sum(axis=1)
+    groups = (group_n > 0).sum(axis=0)
+    levels = (level_n > 0).sum(axis=1)
+    
+    # Every answer at a level shares that level's midrank
+    midranks = np.cumsum(level_n, axis=1) - (level_n - 1) / 2
+    rank_sums = (counts * midranks).sum(axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        h = 12 / (n * (n + 1)) * np.where(group_n > 0, rank_sums ** 2 / group_n, 0).sum(axis=0) - 3 * (n + 1)
+        h = h / (1 - (level_n ** 3 - level_n).sum(axis=1) / (n ** 3 - n))
+        expected = group_n[:, :, None] * level_n[None, :, :] / n[None, :, None]
+        chi2 = np.where(expected > 0, (counts - expected) ** 2 / expected, 0).sum(axis=(0, 2))
+    
+    h_dof = groups - 1
+    chi2_dof = (groups - 1) * (levels - 1)
+    h_ok = (h_dof > 0) & (levels > 1)
+    chi2_ok = chi2_dof > 0
+    return {
+        "n": n.astype(np.int64),
+        "groups": groups,
+        "kruskal_h": np.where(h_ok, h, np.nan),
+        "kruskal_p": np.where(h_ok, scipy_stats.chi2.sf(np.where(h_ok, h, 0), np.maximum(h_dof, 1)), np.nan),
+        "chi2": np.where(chi2_ok, chi2, np.nan),
+        "chi2_dof": chi2_dof,
+        "chi2_p": np.where(chi2_ok, scipy_stats.chi2.sf(np.where(chi2_ok, chi2, 0), np.maximum(chi2_dof, 1)), np.nan),
+    }
+
+def likert_significance(df, matrix=None, dimensions=CUBE_DIMENSIONS):
+    """Kruskal-Wallis and chi-square tests of every Likert item against each demographic (one row per pair)"""
+    matrix = get_likert_matrix(df) if matrix is None else matrix
+    values = np.asarray(matrix.values, dtype=np.int64)
+    n_items = len(matrix.columns)
+    width = max(LIKERT_SCALE) * LIKERT_HALF_POINTS + 1
+    item_offsets = np.arange(n_items) * width
+    
+    tables = []
+    for dim in dimensions:
+        if dim not in df.columns or n_items == 0:
+            continue
+        column = df[dim] if isinstance(df[dim].dtype, pd.CategoricalDtype) else df[dim].astype("category")
+        group = column.cat.codes.to_numpy().astype(np.int64)
+        n_groups = len(column.cat.categories)
+        
+        # Answered cells only: respondents without a group and missing or median-imputed answers are left out
+        present = (values != 0) & ~np.asarray(matrix.missing) & (group >= 0)[:, None]
+        codes = (group[:, None] * (n_items * width) + item_offsets + values)[present]
+        counts = np.bincount(codes, minlength=n_groups * n_items * width).reshape(n_groups, n_items, width)
+        table = pd.DataFrame(_group_level_tests(counts))
+        table.insert(0, "dimension", dim)
+        table.insert(0, "item", list(matrix.columns))
+        tables.append(table)
+    
+    if not tables:
+        return pd.DataFrame(columns=["item", "dimension", "n", "groups", "kruskal_h", "kruskal_p", "kruskal_q",
+                                     "chi2", "chi2_dof", "chi2_p", "chi2_q"])
+    result = pd.concat(tables, ignore_index=True)
+    
+    # One correction family per test across all item x demographic pairs
+    result.insert(result.columns.get_loc("kruskal_p") + 1, "kruskal_q", benjamini_hochberg(result["kruskal_p"]))
+    result["chi2_q"] = benjamini_hochberg(result["chi2_p"])
+    return result
+
+@st.cache_data(max_entries=32)
+def _cached_likert_significance(data_version, selection_key, _df):
+    """Significance table of a frame, memoized per (data version, filter selection)"""
+    return likert_significance(_df)
+
+def get_likert_significance(df):
+    """Significance tests of every Likert item against the demographics"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return likert_significance(df)
+    return _cached_likert_significance(data_version, df.attrs.get("selection_key", ""), df)
+
+def significance_markers(table, dimension, cols):
+    """Star markers from the items' Kruskal-Wallis q-values against one demographic"""
+    q_values = table[table["dimension"] == dimension].set_index("item")["kruskal_q"].reindex(list(cols))
+    markers = np.select(
+        [q_values.to_numpy() < level for level, _ in SIGNIFICANCE_LEVELS],
+        [marker for _, marker in SIGNIFICANCE_LEVELS],
+        default="",
+    )
+    return pd.Series(markers, index=list(cols))
+
+def mark_significant(table, markers):
+    """Heatmap table (items as columns) with significance stars appended to the item labels"""
+    return table.rename(columns=lambda col: f"{col} {markers[col]}" if markers.get(col) else col)
+
+# Cross-tabulation on integer codes: single-answer columns count pairs with one bincount,
+# multi-select columns go through their incidence matrix (respondents x options)
+CROSSTAB_NORMALIZE = {
+    None: "จำนวน (คน)",
+    "index": "สัดส่วนตามแถว",
+    "columns": "สัดส่วนตามคอลัมน์",
+    "all": "สัดส่วนจากทั้งหมด",
+}
+
+def _crosstab_axis(df, col):
+    """Category codes (or a respondent x option incidence matrix) and level labels of one column"""
+    if col in get_survey_schema(df).multiselect:
+        index = get_multiselect_index(df, col)
+        return (index.incidence > 0).astype(np.int64), index.options.rename(col)
+    column = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+    labels = pd.CategoricalIndex(column.cat.categories, dtype=column.dtype, name=col)
+    return column.cat.codes.to_numpy(), labels
+
+def _codes_incidence(codes, n_levels):
+    """Respondent x level indicator matrix of category codes (-1 rows stay empty)"""
+    rows = np.flatnonzero(codes >= 0)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, codes[rows])), shape=(len(codes), n_levels)
+    )
+
+def crosstab(df, row, col, normalize=None, observed=True):
+    """Respondent counts for every (row level, column level) pair, like pd.crosstab"""
+    a, row_labels = _crosstab_axis(df, row)
+    b, col_labels = _crosstab_axis(df, col)
+    if isinstance(a, np.ndarray) and isinstance(b, np.ndarray):
+        valid = (a >= 0) & (b >= 0)
+        pairs = a[valid] * len(col_labels) + b[valid]
+        counts = np.bincount(pairs, minlength=len(row_labels) * len(col_labels))
+        counts = counts.reshape(len(row_labels), len(col_labels))
+    else:
+        if isinstance(a, np.ndarray):
+            a = _codes_incidence(a, len(row_labels))
+        if isinstance(b, np.ndarray):
+            b = _codes_incidence(b, len(col_labels))
+        counts = (a.T @ b).toarray()
+    
+    table = pd.DataFrame(counts, index=row_labels, columns=col_labels)
+    if observed:
+        table = table.loc[counts.sum(axis=1) > 0, counts.sum(axis=0) > 0]
+    if normalize == "index":
+        table = table.div(table.sum(axis=1), axis=0)
+    elif normalize == "columns":
+        table = table.div(table.sum(axis=0), axis=1)
+    elif normalize == "all":
+        table = table / table.to_numpy().sum()
+    return table
+
+@st.cache_data(max_entries=64)
+def _cached_crosstab(data_version, selection_key, row, col, normalize, _df):
+    """Cross-tab memoized per (data version, filter selection, columns, normalization)"""
+    return crosstab(_df, row, col, normalize)
+
+def get_crosstab(df, row, col, normalize=None):
+    """Cross-tab of two answer columns for a (possibly filtered) survey frame"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return crosstab(df, row, col, normalize)
+    return _cached_crosstab(data_version, df.attrs.get("selection_key", ""), row, col, normalize, df)
+
+def grouped_top_k(df, group_col, value_col, k=3):
+    """Top-k values of value_col within every level of group_col, as long rows (group, value, count)"""
+    # One code-level count table; ties keep the value's level order (stable sort)
+    table = get_crosstab(df, group_col, value_col)
+    counts = table.to_numpy()
+    order = np.argsort(-counts, axis=1, kind="stable")[:, :k]
+    top = np.take_along_axis(counts, order, axis=1)
+    
+    groups = np.repeat(np.arange(len(table.index)), order.shape[1])
+    keep = top.ravel() > 0
+    return pd.DataFrame({
+        group_col: np.asarray(table.index)[groups][keep],
+        value_col: np.asarray(table.columns)[order.ravel()][keep],
+        'count': top.ravel()[keep],
+    })
+
+def crosstab_columns(df):
+    """Columns that can be cross-tabulated: categorical answers and multi-select questions"""
+    categorical = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return categorical + [c for c in get_survey_schema(df).multiselect if c not in categorical]
+
+def crosstab_explorer(df):
+    """Expander for building an arbitrary A x B table from the current selection"""
+    with st.expander("ตารางไขว้ระหว่างคำถาม (Crosstab)"):
+        columns = crosstab_columns(df)
+        if len(columns) < 2:
+            st.info("ไม่มีคำถามเพียงพอสำหรับสร้างตารางไขว้")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            row = st.selectbox("แถว", columns, index=columns.index('income_group') if 'income_group' in columns else 0,
+                               format_func=lambda c: FILTER_COLUMNS.get(c, c), key="crosstab_row")
+        with col2:
+            others = [c for c in columns if c != row]
+            col = st.selectbox("คอลัมน์", others, format_func=lambda c: FILTER_COLUMNS.get(c, c), key="crosstab_col")
+        with col3:
+            normalize = st.selectbox("แสดงผล", list(CROSSTAB_NORMALIZE), format_func=CROSSTAB_NORMALIZE.get,
+                                     key="crosstab_normalize")
+        
+        table = get_crosstab(df, row, col, normalize)
+        if table.empty:
+            st.warning("ไม่มีผู้ตอบที่ตอบทั้งสองคำถาม")
+        elif normalize:
+            st.dataframe(table.style.format("{:.1%}"), use_container_width=True)
+        else:
+            st.dataframe(table, use_container_width=True)
+
+# Insight miner: every answer level (category, multi-select option, Likert band) becomes one column
+# of a respondent indicator matrix, so the co-occurrence counts of all column pairs are sparse
+# products. Each level pair is a 2x2 test (segment vs rest x answer vs rest); findings are the
+# over-indexed pairs that survive Benjamini-Hochberg. Large exports are split into column batches
+# mined on a thread pool (the sparse products and NumPy/SciPy kernels release the GIL, and threads
+# are safe to start from the server, unlike a fork); results are kept per data version in memory
+# and on disk.
+MINER_VERSION = 2
+MINER_MIN_SUPPORT = 10
+MINER_FDR = 0.05
+MINER_TOP_FINDINGS = 50
+MINER_OVERVIEW_FINDINGS = 5
+MINER_POLL_SECONDS = 2
+MINER_BATCH_COLUMNS = 8
+MINER_PARALLEL_MIN_CELLS = 5_000_000
+MINER_LIKERT_BANDS = (("1-2", 0, 5), ("3", 6, 7), ("4-5", 8, 10))
+# Columns derived from each other: their pairs are definitional, not findings
+MINER_RELATED_COLUMNS = ({"monthly_income", "income_group"}, {"age", "age_group"})
+
+@dataclass
+class InsightUnits:
+    """Respondent x level indicator matrix of every minable column"""
+    matrix: object
+    columns: tuple
+    level_column: np.ndarray
+    level_labels: tuple
+
+def build_insight_units(df):
+    """Indicator columns for every categorical, multi-select and (banded) Likert column"""
+    schema = get_survey_schema(df)
+    demographic = [c for c in schema.demographic if c in crosstab_columns(df)]
+    columns = demographic + [c for c in crosstab_columns(df) if c not in demographic]
+    
+    blocks, names, level_column, level_labels = [], [], [], []
+    for col in columns:
+        codes, labels = _crosstab_axis(df, col)
+        block = _codes_incidence(codes, len(labels)) if isinstance(codes, np.ndarray) else sparse.csr_matrix(codes)
+        blocks.append(block)
+        level_column += [len(names)] * len(labels)
+        level_labels += [str(label) for label in labels]
+        names.append(col)
+    
+    # Likert items in bands of half-point answer values; unanswered (0) and median-imputed cells
+    # fall in no band, so imputed respondents don't inflate the median band's lift
+    matrix = get_likert_matrix(df)
+    for i, col in enumerate(matrix.columns):
+        values = np.where(np.asarray(matrix.missing[:, i]), 0, np.asarray(matrix.values[:, i]))
+        codes = np.full(len(values), -1, dtype=np.int64)
+        for band, (_, low, high) in enumerate(MINER_LIKERT_BANDS):
+            codes[(values >= max(low, 1)) & (values <= high)] = band
+        blocks.append(_codes_incidence(codes, len(MINER_LIKERT_BANDS)))
+        level_column += [len(names)] * len(MINER_LIKERT_BANDS)
+        level_labels += [label for label, _, _ in MINER_LIKERT_BANDS]
+        names.append(col)
+    
+    return InsightUnits(
+        matrix=sparse.hstack(blocks, format="csc").astype(np.float64) if blocks else sparse.csc_matrix((len(df), 0)),
+        columns=tuple(names),
+        level_column=np.asarray(level_column, dtype=np.int64),
+        level_labels=tuple(level_labels),
+    )
+
+def _mine_column_batch(units, batch):
+    """2x2 tests of the levels of a batch of segment columns against every later column"""
+    level_column = units.level_column
+    rows = np.flatnonzero(np.isin(level_column, batch))
+    cols = np.flatnonzero(level_column > min(batch))
+    if len(rows) == 0 or len(cols) == 0:
+        return {}
+    
+    n = units.matrix.shape[0]
+    sizes = np.asarray(units.matrix.sum(axis=0)).ravel()
+    counts = (units.matrix[:, rows].T @ units.matrix[:, cols]).toarray()
+    
+    # Only pairs of distinct, unrelated columns with enough respondents behind the cell
+    row_col = level_column[rows][:, None]
+    col_col = level_column[cols][None, :]
+    related = np.zeros(counts.shape, dtype=bool)
+    for group in MINER_RELATED_COLUMNS:
+        ids = [i for i, c in enumerate(units.columns) if c in group]
+        related |= np.isin(row_col, ids) & np.isin(col_col, ids)
+    tested = (col_col > row_col) & ~related & (counts >= MINER_MIN_SUPPORT)
+    r, c = np.nonzero(tested)
+    
+    a = counts[r, c]
+    segment = sizes[rows][r]
+    answer = sizes[cols][c]
+    b, d = segment - a, n - segment - answer + a
+    cc = answer - a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        phi = (a * d - b * cc) / np.sqrt(segment * (n - segment) * answer * (n - answer))
+        lift = a * n / (segment * answer)
+    chi2 = n * phi ** 2
+    return {
+        "segment_level": rows[r],
+        "level": cols[c],
+        "count": a,
+        "segment_size": segment,
+        "answer_size": answer,
+        "lift": lift,
+        "phi": phi,
+        "p_value": np.where(np.isfinite(chi2), scipy_stats.chi2.sf(np.nan_to_num(chi2), 1), np.nan),
+    }
+
+def _mine_batches(units, batches):
+    """Run the batches on a thread pool for large exports, sequentially otherwise"""
+    n_cells = units.matrix.shape[0] * units.matrix.shape[1]
+    workers = min(os.cpu_count() or 1, len(batches))
+    if n_cells >= MINER_PARALLEL_MIN_CELLS and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda batch: _mine_column_batch(units, batch), batches))
+    return [_mine_column_batch(units, batch) for batch in batches]
+
+def mine_insights(units, top=MINER_TOP_FINDINGS, fdr=MINER_FDR):
+    """Over-indexed answer pairs ranked by effect size, after Benjamini-Hochberg over every tested pair"""
+    n_columns = len(units.columns)
+    batches = [list(range(start, min(start + MINER_BATCH_COLUMNS, n_columns)))
+               for start in range(0, n_columns, MINER_BATCH_COLUMNS)]
+    parts = [part for part in _mine_batches(units, batches) if part]
+    if not parts:
+        return []
+    found = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    found["q_value"] = benjamini_hochberg(found["p_value"])
+    
+    keep = np.flatnonzero((found["q_value"] < fdr) & (found["lift"] > 1))
+    keep = keep[np.argsort(-found["phi"][keep], kind="stable")][:top]
+    n = units.matrix.shape[0]
+    return [
+        {
+            "segment_column": units.columns[units.level_column[found["segment_level"][i]]],
+            "segment_level": units.level_labels[found["segment_level"][i]],
+            "column": units.columns[units.level_column[found["level"][i]]],
+            "level": units.level_labels[found["level"][i]],
+            "count": int(found["count"][i]),
+            "segment_size": int(found["segment_size"][i]),
+            "share": float(found["count"][i] / found["segment_size"][i]),
+            "baseline": float(found["answer_size"][i] / n),
+            "lift": float(found["lift"][i]),
+            "phi": float(found["phi"][i]),
+            "p_value": float(found["p_value"][i]),
+            "q_value": float(found["q_value"][i]),
+        }
+        for i in keep
+    ]
+
+def insights_path(data_version):
+    """Disk cache file of a data version's mined insights"""
+    return os.path.join(SNAPSHOT_DIR, f"insights-{data_version}-v{MINER_VERSION}.json")
+
+def read_insights(data_version):
+    """Cached insights of a data version, or None if they have not been mined yet"""
+    path = insights_path(data_version)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading insights {path}: {e}")
+        return None
+
+def write_insights(data_version, insights):
+    """Persist mined insights atomically (same scheme as the snapshots)"""
+    path = insights_path(data_version)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(insights, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing insights {path}: {e}")
+
+def _mine_and_store(data_version, units):
+    """Background job: mine a data version and persist the findings"""
+    insights = mine_insights(units)
+    write_insights(data_version, insights)
+    return insights
+
+@st.cache_resource
+def _insight_jobs():
+    """Process-wide background miner: one worker thread and a future per data version"""
+    return {"executor": ThreadPoolExecutor(max_workers=1), "futures": {}, "lock": threading.Lock()}
+
+def start_insight_mining(df):
+    """Start mining a loaded (unfiltered) frame in the background unless its insights already exist"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return
+    jobs = _insight_jobs()
+    with jobs["lock"]:
+        if data_version in jobs["futures"]:
+            return
+        insights = read_insights(data_version)
+        if insights is not None:
+            future = Future()
+            future.set_result(insights)
+        else:
+            # Indicator columns are built here (they reuse the per-version caches); the thread only does numpy work
+            future = jobs["executor"].submit(_mine_and_store, data_version, build_insight_units(df))
+        jobs["futures"][data_version] = future
+
+def get_insights(df):
+    """Mined insights of the frame's data version, or None while the miner is still running"""
+    future = _insight_jobs()["futures"].get(df.attrs.get("data_version"))
+    if future is None or not future.done():
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"Error mining insights: {e}")
+        return []
+
+def insight_text(insight, schema):
+    """One-line Thai description of a mined finding"""
+    segment = schema.display_name(insight["segment_column"])
+    column = schema.display_name(insight["column"])
+    return (
+        f"กลุ่ม {segment} = {insight['segment_level']} ตอบ {column} = {insight['level']} "
+        f"{insight['share']*100:.0f}% เทียบกับ {insight['baseline']*100:.0f}% ของผู้ตอบทั้งหมด "
+        f"(สูงกว่า {insight['lift']:.1f} เท่า)"
+    )
+
+def insights_panel(df):
+    """Overview section with the miner's top findings; polls while the background miner is running"""
+    if df.attrs.get("data_version") not in _insight_jobs()["futures"]:
+        return
+    pending = get_insights(df) is None
+    
+    @st.fragment(run_every=MINER_POLL_SECONDS if pending else None)
+    def panel():
+        st.subheader("ข้อค้นพบอัตโนมัติ")
+        insights = get_insights(df)
+        if insights is None:
+            st.info("กำลังค้นหาความสัมพันธ์ระหว่างคำถามทั้งหมด...")
+            return
+        if pending:
+            # Finished since the page was drawn: redraw the page without polling
+            st.rerun()
+        if not insights:
+            st.info("ไม่พบความแตกต่างที่มีนัยสำคัญทางสถิติ")
+            return
+        
+        schema = get_survey_schema(df)
+        for insight in insights[:MINER_OVERVIEW_FINDINGS]:
+            st.markdown(f"""
+            <div class="insight-box">
+                <p>{insight_text(insight, schema)}</p>
+                <p><small>n = {insight['count']} จาก {insight['segment_size']} คน, q = {insight['q_value']:.3g}</small></p>
+            </div>
+            """, unsafe_allow_html=True)
+        st.caption(f"วิเคราะห์จากผู้ตอบทั้งหมดของ Wave ที่เลือก (ไม่ขึ้นกับตัวกรอง), q < {MINER_FDR} หลังปรับด้วย Benjamini-Hochberg")
+    
+    panel()
+
+# Value-based personas: four scores (row means over small Likert groups) and ordered rules,
+# evaluated as array operations over the Likert matrix instead of row by row
+PERSONA_SCORES = {
+    "quality_focus": ("factor_durability", "factor_warranty", "price_value_for_quality"),
+    "price_sensitive": ("price_within_budget", "promo_discount"),
+    "brand_conscious": ("factor_brand_trust", "price_image_boost"),
+    "convenience_focus": ("channel_fast_shipping", "channel_easy_to_find"),
+}
+PERSONA_TYPES = ("Premium Quality Seeker", "Value Hunter", "Brand Loyalist", "Convenience Lover", "Practical Buyer")
+
+def persona_score_matrix(matrix):
+    """Persona scores (respondents x PERSONA_SCORES) as row means of the answered items"""
+    lookup = {c: i for i, c in enumerate(matrix.columns)}
+    scores = np.empty((len(matrix.values), len(PERSONA_SCORES)))
+    for k, cols in enumerate(PERSONA_SCORES.values()):
+        block = matrix.values[:, [lookup[c] for c in cols]]
+        counts = (block != 0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores[:, k] = block.sum(axis=1, dtype=np.int64) / (counts * LIKERT_HALF_POINTS)
+    return scores
+
+def classify_personas(scores):
+    """Persona label per row of a persona score array; the first matching rule wins"""
+    quality, price, brand, convenience = (scores[:, k] for k in range(len(PERSONA_SCORES)))
+    conditions = [
+        (quality >= 4.5) & (price <= 3.5),
+        (price >= 4.5) & (quality >= 4.0),
+        brand >= 4.0,
+        convenience >= 4.5,
+    ]
+    return np.select(conditions, PERSONA_TYPES[:-1], default=PERSONA_TYPES[-1])
+
+def score_personas(df):
+    """Batch-score respondents: persona scores and persona_type for every row of a frame"""
+    scores = persona_score_matrix(get_likert_matrix(df))
+    result = pd.DataFrame(scores, index=df.index, columns=list(PERSONA_SCORES))
+    result['persona_type'] = pd.Series(classify_personas(scores), index=df.index, dtype=object)
+    return result
+
+# Page statistics: every page's aggregates are computed once per (data version, filter selection)
+# and shared by the Streamlit page and its HTML/PDF generator
+PAGE_STATS_CACHE_ENTRIES = 64
+
+def category_counts(series, top=None):
+    """value_counts without the zero-count categories a categorical column keeps"""
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    return counts.head(top) if top else counts
+
+def most_common(series, default="ไม่ระบุ"):
+    """Most frequent answer (first mode), or a default when there is none"""
+    mode = series.mode()
+    return mode.iloc[0] if not mode.empty else default
+
+def answered(series):
+    """Answers of an open question, without blanks and '-' placeholders"""
+    return series[series.notna() & (series != '') & (series != '-')]
+
+# Keyword lexicon for first-impression sentiment; data/sentiment_lexicon.json (same keys) overrides it
+SENTIMENT_KEYWORDS = {
+    "positive": ['ดี', 'สวย', 'น่าสนใจ', 'ชอบ', 'ทันสมัย', 'หรู', 'คุณภาพ'],
+    "neutral": ['เรียบ', 'ธรรมดา', 'ปกติ', 'กลางๆ'],
+    "negative": ['ไม่', 'แพง', 'เก่า', 'น่าเบื่อ'],
+}
+SENTIMENT_CACHE_SIZE = 50000
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting which keywords occur in a text (overlaps included)"""
+    
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        for k, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].add(k)
+        
+        # Breadth-first failure links; each state also reports its fallback's keywords
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] |= self.output[self.fail[child]]
+    
+    def find(self, text):
+        """Indices of the keywords found in text"""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            found |= self.output[state]
+        return found
+
+def load_sentiment_lexicon(path=SENTIMENT_LEXICON_PATH):
+    """Sentiment keyword lists, overridden per polarity by a JSON lexicon file if present"""
+    lexicon = {polarity: list(words) for polarity, words in SENTIMENT_KEYWORDS.items()}
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                custom = json.load(f)
+            for polarity in lexicon:
+                if polarity in custom:
+                    lexicon[polarity] = [str(word) for word in custom[polarity]]
+        except (OSError, ValueError) as e:
+            print(f"Error loading sentiment lexicon {path}: {e}")
+    return lexicon
+
+@st.cache_resource(max_entries=4)
+def _sentiment_engine(lexicon_key, _lexicon):
+    """Compiled automaton over all lexicon keywords plus a text-hash -> label score cache"""
+    keywords = []
+    polarity_of = []
+    for polarity, words in _lexicon.items():
+        for word in words:
+            keywords.append(normalize_th(word))
+            polarity_of.append(polarity)
+    return KeywordAutomaton(keywords), polarity_of, {}
+
+@st.cache_resource(max_entries=4)
+def _sentiment_lexicon(signature):
+    """Lexicon and its content hash; re-read only when the lexicon file's size or mtime changes"""
+    lexicon = load_sentiment_lexicon()
+    return lexicon, hashlib.sha256(json.dumps(lexicon, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:16]
+
+def sentiment_lexicon_key():
+    """Content hash of the current lexicon (keys results that depend on sentiment labels)"""
+    return _sentiment_lexicon(source_signature(SENTIMENT_LEXICON_PATH))[1]
+
+def get_sentiment_engine():
+    """Sentiment automaton for the current lexicon"""
+    lexicon, lexicon_key = _sentiment_lexicon(source_signature(SENTIMENT_LEXICON_PATH))
+    return _sentiment_engine(lexicon_key, lexicon)
+
+def score_sentiment(text, engine):
+    """Sentiment label of one normalized text"""
+    automaton, polarity_of, _ = engine
+    found = [polarity_of[k] for k in automaton.find(text)]
+    positive_score = found.count("positive")
+    negative_score = found.count("negative")
+    
+    if positive_score > negative_score:
+        return 'เชิงบวก'
+    elif negative_score > positive_score:
+        return 'เชิงลบ'
+    else:
+        return 'กลางๆ'
+
+def classify_sentiments(texts):
+    """Sentiment label per answer; each distinct normalized text is scored once and cached by hash"""
+    engine = get_sentiment_engine()
+    scores = engine[2]
+    codes, uniques = pd.factorize(texts)
+    
+    labels = []
+    for text in uniques:
+        normalized = normalize_th(text)
+        key = hashlib.sha1(normalized.encode()).hexdigest()
+        if key not in scores:
+            if len(scores) >= SENTIMENT_CACHE_SIZE:
+                scores.clear()
+            scores[key] = score_sentiment(normalized, engine)
+        labels.append(scores[key])
+    
+    # Missing answers factorize to -1, which picks the trailing 'ไม่ระบุ'
+    labels = np.array(labels + ['ไม่ระบุ'], dtype=object)
+    return pd.Series(labels[codes], index=texts.index)
+
+# Barrier themes: keyword groups tagged in one automaton pass over the distinct answers
+BARRIER_THEMES = {
+    "price": ['แพง', 'ราคา', 'คุ้ม'],
+    "quality": ['คุณภาพ', 'ทน', 'รีวิว'],
+    "availability": ['หา', 'ซื้อ', 'ไม่รู้'],
+}
+
+@lru_cache(maxsize=16)
+def _theme_automaton(theme_items):
+    """Automaton over every theme keyword, with the theme index of each keyword"""
+    keywords = []
+    theme_of = []
+    for t, (theme, words) in enumerate(theme_items):
+        for word in words:
+            keywords.append(normalize_th(word))
+            theme_of.append(t)
+    return KeywordAutomaton(keywords), theme_of
+
+def build_theme_matrix(texts, themes):
+    """Respondent x theme boolean matrix: True where the answer mentions any of the theme's keywords"""
+    theme_items = tuple((theme, tuple(words)) for theme, words in themes.items())
+    automaton, theme_of = _theme_automaton(theme_items)
+    codes, uniques = pd.factorize(texts)
+    
+    # One extra all-False row for missing answers (code -1)
+    hits = np.zeros((len(uniques) + 1, len(theme_items)), dtype=bool)
+    for u, text in enumerate(uniques):
+        for k in automaton.find(normalize_th(text)):
+            hits[u, theme_of[k]] = True
+    return pd.DataFrame(hits[codes], index=texts.index, columns=list(themes))
+
+@st.cache_resource(max_entries=16)
+def _theme_matrix_for_version(data_version, column, themes_key, _df, _themes):
+    """Theme matrix of one open-ended column of a full loaded frame"""
+    return build_theme_matrix(get_base_frame(_df)[column], _themes)
+
+def get_theme_matrix(df, column, themes=None):
+    """Theme matrix rows for a (possibly filtered) survey frame"""
+    themes = BARRIER_THEMES if themes is None else themes
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return build_theme_matrix(df[column], themes)
+    themes_key = json.dumps(themes, sort_keys=True, ensure_ascii=False)
+    matrix = _theme_matrix_for_version(data_version, column, themes_key, df, themes)
+    if isinstance(df.index, pd.RangeIndex) and len(df) == len(matrix):
+        return matrix
+    return matrix.iloc[df.index.to_numpy()]
+
+@dataclass
+class OverviewStats:
+    """Headline numbers of the overview page"""
+    n_respondents: int
+    avg_age: float
+    gender_counts: pd.Series
+    female_count: int
+    female_pct: float
+    student_pct: float
+    factor_means: pd.Series
+    popular_price: object
+    popular_frequency: object
+
+def compute_overview_stats(df):
+    """Aggregates behind the overview page"""
+    schema = get_survey_schema(df)
+    gender_counts = category_counts(df['gender'])
+    female_count = gender_counts.get('หญิง', 0)
+    factor_cols = schema.block("factor")
+    price_col = schema.resolve('preferred_price_range')
+    
+    return OverviewStats(
+        n_respondents=len(df),
+        avg_age=df['age'].mean(),
+        gender_counts=gender_counts,
+        female_count=female_count,
+        female_pct=(female_count/len(df)*100) if len(df) > 0 else 0,
+        student_pct=(df['occupation'] == 'นักเรียน/นักศึกษา').mean() * 100 if 'occupation' in df.columns else 0,
+        factor_means=get_likert_matrix(df).mean(factor_cols, impute=False).sort_values(ascending=False) if factor_cols else pd.Series(dtype=float),
+        popular_price=most_common(df[price_col]) if price_col else None,
+        popular_frequency=most_common(df['luggage_frequency']) if 'luggage_frequency' in df.columns else None,
+    )
+
+@dataclass
+class DemographicsStats:
+    """Respondent breakdowns of the demographics page"""
+    n_respondents: int
+    gender_counts: pd.Series
+    age_counts: pd.Series
+    income_counts: pd.Series
+    occupation_counts: pd.Series
+
+def compute_demographics_stats(df):
+    """Aggregates behind the demographics page"""
+    empty = pd.Series(dtype="int64")
+    return DemographicsStats(
+        n_respondents=len(df),
+        gender_counts=category_counts(df['gender']),
+        age_counts=df['age_group'].value_counts().sort_index() if 'age_group' in df.columns else empty,
+        income_counts=df['income_group'].value_counts().sort_index() if 'income_group' in df.columns else empty,
+        occupation_counts=category_counts(df['occupation'], top=10) if 'occupation' in df.columns else empty,
+    )
+
+@dataclass
+class FactorsStats:
+    """Purchase-factor importance, overall and by demographic"""
+    factor_means: pd.Series
+    factor_ci: object
+    gender_factors: object
+    income_factors: object
+    gender_markers: object
+    income_markers: object
+
+def compute_factors_stats(df):
+    """Aggregates behind the decision-factors page"""
+    factor_cols = get_survey_schema(df).block("factor")
+    if not factor_cols:
+        return FactorsStats(pd.Series(dtype=float), None, None, None, None, None)
+    
+    # Answered-only means: the statistic the bootstrap intervals drawn on the chart resample
+    factor_means = get_likert_matrix(df).mean(factor_cols, impute=False).sort_values(ascending=False)
+    
+    # Demographic breakdowns are roll-ups of the precomputed cube
+    cube = get_likert_cube(df)
+    significance = get_likert_significance(df)
+    return FactorsStats(
+        factor_means=factor_means,
+        factor_ci=get_likert_ci(df, factor_means.index),
+        gender_factors=cube.mean('gender', factor_cols),
+        income_factors=cube.mean('income_group', factor_cols, observed=False) if 'income_group' in cube.dimensions else None,
+        gender_markers=significance_markers(significance, 'gender', factor_cols),
+        income_markers=significance_markers(significance, 'income_group', factor_cols),
+    )
+
+@dataclass
+class ProductsStats:
+    """Product preference counts"""
+    n_respondents: int
+    style_counts: object
+    bag_counts: object
+    size_counts: object
+
+def compute_products_stats(df):
+    """Aggregates behind the product-preferences page"""
+    return ProductsStats(
+        n_respondents=len(df),
+        style_counts=get_multiselect_index(df, 'preferred_styles').counts().head(10) if 'preferred_styles' in df.columns else None,
+        bag_counts=get_multiselect_index(df, 'used_bag_types').counts().head(8) if 'used_bag_types' in df.columns else None,
+        size_counts=category_counts(df['luggage_size_short_trip']) if 'luggage_size_short_trip' in df.columns else None,
+    )
+
+@dataclass
+class PricingStats:
+    """Price range preferences, price factors and price vs income"""
+    n_respondents: int
+    price_col: object
+    price_counts: object
+    price_means: pd.Series
+    price_ci: object
+    price_income: object
+
+def compute_pricing_stats(df):
+    """Aggregates behind the price-sensitivity page"""
+    schema = get_survey_schema(df)
+    price_col = schema.resolve('preferred_price_range')
+    price_factor_cols = schema.block("price")
+    price_means = get_likert_matrix(df).mean(price_factor_cols, impute=False).sort_values(ascending=False) if price_factor_cols else pd.Series(dtype=float)
+    
+    price_income = None
+    if 'income_group' in df.columns and price_col:
+        # Respondents with both answers; NaN on either side is skipped
+        price_income = get_crosstab(df, 'income_group', price_col)
+        if price_income.empty:
+            price_income = None
+    
+    return PricingStats(
+        n_respondents=len(df),
+        price_col=price_col,
+        price_counts=category_counts(df[price_col]) if price_col else None,
+        price_means=price_means,
+        price_ci=get_likert_ci(df, price_means.index),
+        price_income=price_income,
+    )
+
+@dataclass
+class ChannelsStats:
+    """Platform and purchase-channel usage"""
+    n_respondents: int
+    platform_counts: object
+    channel_counts: object
+    age_channels: object
+
+def compute_channels_stats(df):
+    """Aggregates behind the sales-channels page"""
+    age_channels = None
+    if 'purchase_channels' in df.columns and 'age_group' in df.columns and 'most_used_platform' in df.columns:
+        # Top 3 platforms within each age group
+        age_channels = grouped_top_k(df, 'age_group', 'most_used_platform', k=3)
+        age_channels = age_channels.rename(columns={'most_used_platform': 'channel'}) if len(age_channels) else None
+    
+    return ChannelsStats(
+        n_respondents=len(df),
+        platform_counts=category_counts(df['most_used_platform'], top=10) if 'most_used_platform' in df.columns else None,
+        channel_counts=get_multiselect_index(df, 'purchase_channels').counts().head(10) if 'purchase_channels' in df.columns else None,
+        age_channels=age_channels,
+    )
+
+@dataclass
+class MarketingStats:
+    """Promotion effectiveness and presenter preferences"""
+    promo_means: pd.Series
+    promo_ci: object
+    presenter_counts: object
+
+def compute_marketing_stats(df):
+    """Aggregates behind the marketing page"""
+    promo_cols = get_survey_schema(df).block("promo")
+    presenter_counts = None
+    if 'preferred_presenter' in df.columns:
+        presenter_counts = df['preferred_presenter'].value_counts().head(10)
+        presenter_counts = presenter_counts[presenter_counts.index != '-']  # Remove empty values
+    
+    promo_means = get_likert_matrix(df).mean(promo_cols, impute=False).sort_values(ascending=False) if promo_cols else pd.Series(dtype=float)
+    return MarketingStats(
+        promo_means=promo_means,
+        promo_ci=get_likert_ci(df, promo_means.index),
+        presenter_counts=presenter_counts,
+    )
+
+@dataclass
+class BrandAwarenessStats:
+    """T.Partner recognition levels and first-contact channels"""
+    n_respondents: int
+    awareness_counts: object
+    know_brand: int
+    seen_before: int
+    never_heard: int
+    first_channel_counts: object
+    first_channel_responses: int
+
+def compute_brand_awareness_stats(df):
+    """Aggregates behind the brand-awareness page"""
+    awareness_counts = None
+    know_brand = seen_before = never_heard = 0
+    if 'know_tpartner' in df.columns:
+        awareness_counts = category_counts(df['know_tpartner'])
+        know_brand = (df['know_tpartner'] == 'รู้จัก และรู้ว่าเป็นแบรนด์กระเป๋าเดินทาง').sum()
+        seen_before = (df['know_tpartner'] == 'เคยเห็นผ่านตา แต่ไม่แน่ใจว่าแบรนด์ทำอะไร').sum()
+        never_heard = (df['know_tpartner'] == 'ไม่รู้จักมาก่อนเลย').sum()
+    
+    first_channel_counts = None
+    first_channel_responses = 0
+    if 'tpartner_first_channel' in df.columns:
+        first_channels = answered(df['tpartner_first_channel'])
+        first_channel_responses = len(first_channels)
+        if first_channel_responses > 0:
+            first_channel_counts = category_counts(first_channels, top=10)
+    
+    return BrandAwarenessStats(
+        n_respondents=len(df),
+        awareness_counts=awareness_counts,
+        know_brand=know_brand,
+        seen_before=seen_before,
+        never_heard=never_heard,
+        first_channel_counts=first_channel_counts,
+        first_channel_responses=first_channel_responses,
+    )
+
+@dataclass
+class BrandImageStats:
+    """Brand positioning, first impressions, consideration and purchase barriers"""
+    n_respondents: int
+    positioning_counts: object
+    positioning_responses: int
+    sentiment_counts: object
+    considered_counts: object
+    barrier_counts: object
+    barrier_responses: int
+    barrier_theme_counts: object
+
+def compute_brand_image_stats(df):
+    """Aggregates behind the brand-image & barriers page"""
+    positioning_counts = None
+    positioning_responses = 0
+    if 'tpartner_positioning' in df.columns:
+        positioning = answered(df['tpartner_positioning'])
+        positioning_responses = len(positioning)
+        if positioning_responses > 0:
+            positioning_counts = category_counts(positioning, top=8)
+    
+    sentiment_counts = None
+    if 'first_impression' in df.columns:
+        impressions = answered(df['first_impression'])
+        if len(impressions) > 0:
+            sentiment_counts = classify_sentiments(impressions).value_counts()
+    
+    barrier_counts = None
+    barrier_theme_counts = None
+    barrier_responses = 0
+    if 'reason_not_chosen' in df.columns:
+        barriers = answered(df['reason_not_chosen'])
+        barrier_responses = len(barriers)
+        if barrier_responses > 0:
+            barrier_counts = category_counts(barriers, top=10)
+            barrier_theme_counts = get_theme_matrix(df, 'reason_not_chosen').sum()
+    
+    return BrandImageStats(
+        n_respondents=len(df),
+        positioning_counts=positioning_counts,
+        positioning_responses=positioning_responses,
+        sentiment_counts=sentiment_counts,
+        considered_counts=category_counts(df['considered_tpartner']) if 'considered_tpartner' in df.columns else None,
+        barrier_counts=barrier_counts,
+        barrier_responses=barrier_responses,
+        barrier_theme_counts=barrier_theme_counts,
+    )
+
+@dataclass
+class PersonaProfile:
+    """Profile of one value-based persona"""
+    count: int
+    top_gender: object
+    top_gender_count: int
+    avg_age: float
+    top_income: object
+    top_frequency: object
+    top_platform: object
+    factor_scores: pd.Series
+    price_scores: pd.Series
+    channel_scores: pd.Series
+    promo_scores: pd.Series
+
+@dataclass
+class PersonasStats:
+    """Persona scores, sizes and profiles"""
+    n_respondents: int
+    scores: pd.DataFrame
+    persona_counts: pd.Series
+    profiles: dict
+
+def compute_personas_stats(df):
+    """Aggregates behind the customer-personas page"""
+    schema = get_survey_schema(df)
+    scores = score_personas(df)
+    persona_counts = scores['persona_type'].value_counts()
+    
+    profiles = {}
+    for persona_name, count in persona_counts.items():
+        persona_df = df[(scores['persona_type'] == persona_name).to_numpy()]
+        persona_matrix = get_likert_matrix(persona_df)
+        gender_dist = category_counts(persona_df['gender'])
+        profiles[persona_name] = PersonaProfile(
+            count=count,
+            top_gender=gender_dist.index[0],
+            top_gender_count=gender_dist.iloc[0],
+            avg_age=persona_df['age'].mean(),
+            top_income=most_common(persona_df['monthly_income']),
+            top_frequency=most_common(persona_df['luggage_frequency']) if 'luggage_frequency' in persona_df.columns else None,
+            top_platform=most_common(persona_df['most_used_platform']) if 'most_used_platform' in persona_df.columns else None,
+            factor_scores=persona_matrix.mean(schema.block("factor")).sort_values(ascending=False),
+            price_scores=persona_matrix.mean(schema.block("price")).sort_values(ascending=False),
+            channel_scores=persona_matrix.mean(schema.block("channel")).sort_values(ascending=False),
+            promo_scores=persona_matrix.mean(schema.block("promo")).sort_values(ascending=False),
+        )
+    
+    return PersonasStats(
+        n_respondents=len(df),
+        scores=scores,
+        persona_counts=persona_counts,
+        profiles=profiles,
+    )
+
+PAGE_STATS_BUILDERS = {
+    "overview": compute_overview_stats,
+    "demographics": compute_demographics_stats,
+    "factors": compute_factors_stats,
+    "products": compute_products_stats,
+    "pricing": compute_pricing_stats,
+    "channels": compute_channels_stats,
+    "marketing": compute_marketing_stats,
+    "brand_awareness": compute_brand_awareness_stats,
+    "brand_image": compute_brand_image_stats,
+    "personas": compute_personas_stats,
+}
+
+@st.cache_resource(max_entries=PAGE_STATS_CACHE_ENTRIES)
+def _cached_page_stats(page, data_version, selection_key, lexicon_key, _df):
+    """Page statistics memoized per (page, data version, filter selection, lexicon); shared, LRU-evicted"""
+    return PAGE_STATS_BUILDERS[page](_df)
+
+def get_page_stats(page, df):
+    """Statistics object behind one dashboard page, shared by the page and its PDF export"""
+    data_version = df.attrs.get("data_version")
+    if data_version is None:
+        return PAGE_STATS_BUILDERS[page](df)
+    return _cached_page_stats(page, data_version, df.attrs.get("selection_key", ""), sentiment_lexicon_key(), df)
 
 # PDF Export Functions
+PDF_PAGE_CSS = '@page { size: A4 landscape; margin: 2cm; }'
+
 def create_pdf_template():
     """Create HTML template for PDF export"""
     html_template = """
@@ -756,20 +2959,24 @@ def create_pdf_template():
         </style>
     </head>
     <body>
+        {% if not hide_header %}
         <div class="header">
             <h1>{{ title }}</h1>
             <p>{{ subtitle }}</p>
             <p>วันที่สร้างรายงาน: {{ date }}</p>
         </div>
+        {% endif %}
         
         <div class="content">
             {{ content }}
         </div>
         
+        {% if not hide_footer %}
         <div class="footer">
             <p>รายงานนี้สร้างจาก Suitcase Insights Dashboard</p>
             <p>© {{ current_year }} - วิเคราะห์ข้อมูลการสำรวจพฤติกรรมผู้บริโภคกระเป๋าเดินทาง</p>
         </div>
+        {% endif %}
     </body>
     </html>
     """
@@ -801,7 +3008,321 @@ def get_page_content_as_html(page_name, df):
     elif page_name == "Customer Personas":
         content_html = generate_personas_html(df)
     
-    return content_html
+    return content_html
+
+# Chart rasterization: inside chart_batch() plotly_to_base64 only styles the figure and returns a
+# placeholder; on fill() every collected figure is rendered in one kaleido browser with a tab per
+# worker. The browser stays open across reports (closed at exit), so Chrome is launched once per
+# process rather than once per report. Report charts are exported as SVG (embedded by WeasyPrint
+# as vectors) unless CHART_EXPORT_FORMAT=png
+CHART_IMAGE_OPTIONS = dict(format="png", width=900, height=600, scale=2)
+CHART_EXPORT_FORMAT = os.environ.get("CHART_EXPORT_FORMAT", "svg")
+# Plotly draws these as bitmaps inside the SVG (or through WebGL), so they stay PNG
+CHART_RASTER_TRACE_TYPES = frozenset({"heatmap", "histogram2d", "image", "scattergl", "splom"})
+CHART_MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+CHART_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+CHART_BROWSER_START_TIMEOUT = 60
+_CHART_BATCH = contextvars.ContextVar("chart_batch", default=None)
+
+def chart_image_options(format="png"):
+    """Render options of an export format (same canvas for every format)"""
+    return dict(CHART_IMAGE_OPTIONS, format=format)
+
+def chart_data_uri(img_bytes, format="png"):
+    """Data URI for embedding rendered chart bytes in the report HTML"""
+    return f"data:{CHART_MIME_TYPES[format]};base64,{base64.b64encode(img_bytes).decode()}"
+
+def chart_export_format(fig_dict, format=CHART_EXPORT_FORMAT):
+    """Format a figure is exported in: the requested one, or PNG for bitmap/WebGL trace types"""
+    if format == "svg" and any(trace.get("type") in CHART_RASTER_TRACE_TYPES for trace in fig_dict.get("data", ())):
+        return "png"
+    return format
+
+def render_chart_image(fig, options=None):
+    """Render one figure (PNG unless options say otherwise), or None if rendering fails"""
+    try:
+        import plotly.io as pio
+        return pio.to_image(fig, **(options or CHART_IMAGE_OPTIONS))
+    except Exception as e:
+        print(f"Error converting plotly to image: {e}")
+        return None
+
+@st.cache_resource
+def _kaleido_browser(workers=CHART_RENDER_WORKERS):
+    """Open kaleido browser with a tab per worker, kept warm on its own event loop thread"""
+    from kaleido import Kaleido
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="kaleido-browser", daemon=True).start()
+    
+    async def open_browser():
+        browser = Kaleido(n=workers)
+        await browser.open()
+        return browser
+    
+    # A browser that fails to start is not cached, so the next export tries again
+    future = asyncio.run_coroutine_threadsafe(open_browser(), loop)
+    try:
+        browser = future.result(timeout=CHART_BROWSER_START_TIMEOUT)
+    except BaseException:
+        future.cancel()
+        loop.call_soon_threadsafe(loop.stop)
+        raise
+    atexit.register(_close_kaleido_browser, browser, loop)
+    return browser, loop
+
+def _close_kaleido_browser(browser, loop):
+    """Shut the warm kaleido browser and its event loop down"""
+    try:
+        asyncio.run_coroutine_threadsafe(browser.close(), loop).result(timeout=10)
+    except Exception as e:
+        print(f"Error closing chart renderer: {e}")
+    loop.call_soon_threadsafe(loop.stop)
+
+def _rasterize_charts(figs, workers=CHART_RENDER_WORKERS, options=None):
+    """Render figures concurrently; image bytes per figure (None where rendering failed)"""
+    options = options or CHART_IMAGE_OPTIONS
+    if not figs:
+        return []
+    try:
+        # kaleido v1 renders through a Chrome browser; legacy versions have no Kaleido class
+        from kaleido import Kaleido  # noqa: F401
+    except ImportError:
+        # Legacy kaleido serializes every export through one shared renderer subprocess, so
+        # charts are simply rendered one after another
+        return [render_chart_image(fig, options) for fig in figs]
+    
+    try:
+        browser, loop = _kaleido_browser(workers)
+    except Exception as e:
+        print(f"Error starting chart renderer: {e}")
+        return [None] * len(figs)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f"chart-{i}.{options['format']}") for i in range(len(figs))]
+        try:
+            # Concurrent exports share the browser's tabs; each waits only for its own figures
+            errors = asyncio.run_coroutine_threadsafe(
+                browser.write_fig_from_object(
+                    [{"fig": fig, "path": path, "opts": dict(options)} for fig, path in zip(figs, paths)]
+                ),
+                loop,
+            ).result()
+            for e in errors or ():
+                print(f"Error converting plotly to image: {e}")
+        except Exception as e:
+            # The browser itself broke (e.g. Chrome crashed): drop it so the next export relaunches
+            print(f"Error converting plotly to image: {e}")
+            _kaleido_browser.clear()
+        images = []
+        for path in paths:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    images.append(f.read())
+            else:
+                images.append(None)
+        return images
+
+# Rendered chart cache: images are content-addressed by the figure JSON and render options, kept
+# as files so every process and replica sharing the directory reuses them; least recently used
+# files (by mtime, refreshed on every hit) are evicted beyond the size bound
+CHART_CACHE_DIR = os.environ.get("CHART_CACHE_DIR", os.path.join("data", ".chart_cache"))
+CHART_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_chart_cache_counts = {"hits": 0, "misses": 0}
+_chart_cache_lock = threading.Lock()
+
+def chart_cache_key(fig, options=None):
+    """Content hash of a figure's normalized JSON plus the render options"""
+    from plotly.utils import PlotlyJSONEncoder
+    fig_dict = fig if isinstance(fig, dict) else fig.to_dict()
+    payload = json.dumps(
+        {"figure": fig_dict, "options": options or CHART_IMAGE_OPTIONS},
+        cls=PlotlyJSONEncoder, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def chart_cache_path(key, options=None):
+    """Cache file of a chart key (fanned out by its first two hex digits)"""
+    extension = (options or CHART_IMAGE_OPTIONS)["format"]
+    return os.path.join(CHART_CACHE_DIR, key[:2], f"{key}.{extension}")
+
+def read_cached_chart(key, options=None):
+    """Cached image bytes of a chart key, or None on a miss"""
+    path = chart_cache_path(key, options)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return data
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading cached chart {path}: {e}")
+        return None
+
+def write_cached_chart(key, data, options=None):
+    """Store rendered image bytes atomically under their chart key"""
+    path = chart_cache_path(key, options)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing cached chart {path}: {e}")
+
+def _chart_cache_entries():
+    """(mtime, size, path) of every finished file in the chart cache"""
+    entries = []
+    try:
+        for shard in os.scandir(CHART_CACHE_DIR):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        pass
+    return entries
+
+def evict_chart_cache(max_bytes=CHART_CACHE_MAX_BYTES):
+    """Delete least recently used chart files until the cache fits in max_bytes"""
+    entries = _chart_cache_entries()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            # Another process evicted it first
+            total -= size
+        except Exception as e:
+            print(f"Error evicting cached chart {path}: {e}")
+
+def chart_cache_stats():
+    """Hit and miss counts of the chart cache in this process, plus its files and bytes on disk"""
+    with _chart_cache_lock:
+        stats = dict(_chart_cache_counts)
+    entries = _chart_cache_entries()
+    stats["files"] = len(entries)
+    stats["bytes"] = sum(size for _, size, _ in entries)
+    return stats
+
+def chart_cache_sidebar():
+    """Admin expander with the chart cache's hit rate and size"""
+    with st.sidebar.expander("Chart cache (admin)"):
+        stats = chart_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{stats['hits'] / lookups * 100:.0f}%" if lookups else "-"
+        st.caption(f"Hits: {stats['hits']} | Misses: {stats['misses']} | Hit rate: {hit_rate}")
+        st.caption(
+            f"On disk: {stats['files']} charts, {stats['bytes'] / 1024 / 1024:.1f} MB "
+            f"of {CHART_CACHE_MAX_BYTES / 1024 / 1024:.0f} MB"
+        )
+
+def render_chart_images(figs, workers=CHART_RENDER_WORKERS, options=None):
+    """Image bytes per figure from the chart cache, rasterizing (once) only the figures it lacks"""
+    keys = [chart_cache_key(fig, options) for fig in figs]
+    images = {key: read_cached_chart(key, options) for key in dict.fromkeys(keys)}
+    missing = [key for key, data in images.items() if data is None]
+    misses = sum(images[key] is None for key in keys)
+    with _chart_cache_lock:
+        _chart_cache_counts["hits"] += len(keys) - misses
+        _chart_cache_counts["misses"] += misses
+    
+    if missing:
+        # Identical figures share a key, so each distinct chart is rendered once
+        figure_of = dict(zip(keys, figs))
+        for key, data in zip(missing, _rasterize_charts([figure_of[key] for key in missing], workers, options)):
+            if data:
+                write_cached_chart(key, data, options)
+            images[key] = data
+        evict_chart_cache()
+    return [images[key] for key in keys]
+
+def _timed_chart_render(figs, format, workers=CHART_RENDER_WORKERS):
+    """Render figures in one format; (image bytes per figure, seconds taken)"""
+    started = datetime.now()
+    images = render_chart_images(figs, workers, chart_image_options(format)) if figs else []
+    return images, (datetime.now() - started).total_seconds()
+
+def chart_report_text(report):
+    """One-line summary of a chart render report ({format: charts, bytes, seconds})"""
+    return ", ".join(
+        f"{format.upper()} {row['charts']} charts {row['bytes'] / 1024:.1f} KB in {row['seconds']:.2f} s"
+        for format, row in report.items()
+    )
+
+class ChartBatch:
+    """Figures deferred by plotly_to_base64 while a chart_batch() is active"""
+    
+    def __init__(self, format=CHART_EXPORT_FORMAT):
+        self.key = f"{id(self):x}"
+        self.format = format
+        self.figures = []
+        self.report = {}
+        self.images = None
+    
+    def add(self, fig):
+        """Keep a snapshot of a styled figure and return its placeholder image source"""
+        self.figures.append(fig.to_dict())
+        return f"chart-pending:{self.key}:{len(self.figures) - 1}:"
+    
+    def render(self):
+        """Render the collected figures (once; fill() calls this on first use)"""
+        formats = [chart_export_format(fig, self.format) for fig in self.figures]
+        images = [None] * len(self.figures)
+        for format in dict.fromkeys(formats):
+            positions = [i for i, f in enumerate(formats) if f == format]
+            rendered, seconds = _timed_chart_render([self.figures[i] for i in positions], format)
+            for i, img_bytes in zip(positions, rendered):
+                images[i] = img_bytes
+            self._record(format, rendered, seconds)
+        
+        # Any chart the vector export could not produce is retried as PNG
+        retry = [i for i, f in enumerate(formats) if f != "png" and not images[i]]
+        if retry:
+            rendered, seconds = _timed_chart_render([self.figures[i] for i in retry], "png")
+            for i, img_bytes in zip(retry, rendered):
+                images[i] = img_bytes
+                formats[i] = "png"
+            self._record("png", rendered, seconds)
+        if self.report:
+            print(f"Chart export: {chart_report_text(self.report)}")
+        self.images = list(zip(images, formats))
+    
+    def fill(self, html):
+        """Put the rendered figures in place of their placeholders"""
+        if self.images is None:
+            self.render()
+
+        # One pass over the HTML; each match reads its whole terminated index, so chart 1 can
+        # never match the start of chart 10's placeholder
+        def image_tag(match):
+            img_bytes, format = self.images[int(match.group(2))]
+            if not img_bytes:
+                # Same as a chart that failed to render inline: no image at all
+                return ""
+            return match.group(1) + chart_data_uri(img_bytes, format) + match.group(3)
+        return re.sub(rf'(<img src=")chart-pending:{re.escape(self.key)}:(\d+):("[^>]*>)', image_tag, html)
+    
+    def _record(self, format, images, seconds):
+        row = self.report.setdefault(format, {"charts": 0, "bytes": 0, "seconds": 0.0})
+        row["charts"] += sum(1 for img in images if img)
+        row["bytes"] += sum(len(img) for img in images if img)
+        row["seconds"] += seconds
+
+@contextmanager
+def chart_batch(format=CHART_EXPORT_FORMAT):
+    """Defer chart rendering of the HTML built in this block; call fill() on the result"""
+    batch = ChartBatch(format)
+    token = _CHART_BATCH.set(batch)
+    try:
+        yield batch
+    finally:
+        _CHART_BATCH.reset(token)
 
 def plotly_to_base64(fig):
     """Convert Plotly figure to base64 image"""
@@ -903,28 +3424,22 @@ def plotly_to_base64(fig):
                 )
             )
         
-        # Convert to image with high quality settings
-        img_bytes = pio.to_image(
-            fig, 
-            format="png", 
-            width=900, 
-            height=600, 
-            scale=2,
-            engine="kaleido"  # Use kaleido engine for better color reproduction
-        )
-        img_base64 = base64.b64encode(img_bytes).decode()
-        return f"data:image/png;base64,{img_base64}"
+        # Inside a chart batch the figure is rasterized later, together with the rest of the report
+        batch = _CHART_BATCH.get()
+        if batch is not None:
+            return batch.add(fig)
+        
+        # Convert to image with high quality settings (or reuse an identical earlier render)
+        img_bytes = render_chart_images([fig])[0]
+        return chart_data_uri(img_bytes) if img_bytes else None
     except Exception as e:
         print(f"Error converting plotly to image: {e}")
         return None
 
 def generate_overview_html(df):
     """Generate HTML content for overview page"""
-    avg_age = df['age'].mean()
-    gender_counts = df['gender'].value_counts()
-    female_count = gender_counts.get('หญิง', 0)
-    female_pct = (female_count/len(df)*100) if len(df) > 0 else 0
-    student_pct = (df['occupation'] == 'นักเรียน/นักศึกษา').mean() * 100 if 'occupation' in df.columns else 0
+    stats = get_page_stats("overview", df)
+    gender_counts = stats.gender_counts
     
     # Create gender pie chart
     gender_chart_html = ""
@@ -950,26 +3465,22 @@ def generate_overview_html(df):
     
     # Factor analysis
     factor_insight = ""
-    factor_cols = [c for c in df.columns if c.startswith("factor_")]
-    if factor_cols:
-        factor_means = df[factor_cols].mean().sort_values(ascending=False)
-        top_factor = factor_means.index[0].replace("factor_", "").replace("_", " ")
+    if not stats.factor_means.empty:
+        top_factor = likert_display_name(stats.factor_means.index[0])
         factor_insight = f"""
         <div class="insight-box">
             <h4>ปัจจัยสำคัญที่สุด</h4>
-            <p><strong>{top_factor}</strong> ได้คะแนนเฉลี่ย {factor_means.iloc[0]:.2f} จาก 5</p>
+            <p><strong>{top_factor}</strong> ได้คะแนนเฉลี่ย {stats.factor_means.iloc[0]:.2f} จาก 5</p>
         </div>
         """
     
     # Price preference
     price_insight = ""
-    price_col = 'preferred_price_range ' if 'preferred_price_range ' in df.columns else 'preferred_price_range'
-    if price_col in df.columns:
-        popular_price = df[price_col].mode().iloc[0] if not df[price_col].mode().empty else "ไม่ระบุ"
+    if stats.popular_price is not None:
         price_insight = f"""
         <div class="insight-box">
             <h4>ช่วงราคาที่นิยม</h4>
-            <p><strong>{popular_price}</strong> เป็นช่วงราคาที่ผู้ตอบแบบสำรวจเลือกมากที่สุด</p>
+            <p><strong>{stats.popular_price}</strong> เป็นช่วงราคาที่ผู้ตอบแบบสำรวจเลือกมากที่สุด</p>
         </div>
         """
     
@@ -979,25 +3490,25 @@ def generate_overview_html(df):
     <div class="metrics-grid">
         <div class="metric-card">
             <h3>ผู้เข้าร่วม</h3>
-            <h2>{len(df)}</h2>
+            <h2>{stats.n_respondents}</h2>
             <p>คน</p>
         </div>
         
         <div class="metric-card">
             <h3>อายุเฉลี่ย</h3>
-            <h2>{avg_age:.1f}</h2>
+            <h2>{stats.avg_age:.1f}</h2>
             <p>ปี</p>
         </div>
         
         <div class="metric-card">
             <h3>เพศหญิง</h3>
-            <h2>{female_count}</h2>
-            <p>คน ({female_pct:.1f}%)</p>
+            <h2>{stats.female_count}</h2>
+            <p>คน ({stats.female_pct:.1f}%)</p>
         </div>
         
         <div class="metric-card">
             <h3>นักเรียน/นักศึกษา</h3>
-            <h2>{student_pct:.1f}%</h2>
+            <h2>{stats.student_pct:.1f}%</h2>
             <p>ของผู้ตอบ</p>
         </div>
     </div>
@@ -1015,7 +3526,7 @@ def generate_overview_html(df):
     """
     
     for gender, count in gender_counts.items():
-        percentage = (count / len(df)) * 100
+        percentage = (count / stats.n_respondents) * 100
         html_content += f"""
             <tr>
                 <td>{gender}</td>
@@ -1039,17 +3550,11 @@ def generate_overview_html(df):
 
 def generate_demographics_html(df):
     """Generate HTML content for demographics page"""
-    # Gender breakdown
-    gender_counts = df['gender'].value_counts()
-    
-    # Age breakdown
-    age_counts = df['age_group'].value_counts().sort_index() if 'age_group' in df.columns else pd.Series()
-    
-    # Income breakdown
-    income_counts = df['income_group'].value_counts().sort_index() if 'income_group' in df.columns else pd.Series()
-    
-    # Occupation breakdown
-    occupation_counts = df['occupation'].value_counts().head(10) if 'occupation' in df.columns else pd.Series()
+    stats = get_page_stats("demographics", df)
+    gender_counts = stats.gender_counts
+    age_counts = stats.age_counts
+    income_counts = stats.income_counts
+    occupation_counts = stats.occupation_counts
     
     # Create charts
     charts_html = ""
@@ -1148,7 +3653,7 @@ def generate_demographics_html(df):
     """
     
     for gender, count in gender_counts.items():
-        percentage = (count / len(df)) * 100
+        percentage = (count / stats.n_respondents) * 100
         html_content += f"""
                     <tr>
                         <td>{gender}</td>
@@ -1179,7 +3684,7 @@ def generate_demographics_html(df):
         """
         
         for age_group, count in age_counts.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             html_content += f"""
                     <tr>
                         <td>{age_group}</td>
@@ -1212,7 +3717,7 @@ def generate_demographics_html(df):
         """
         
         for income_group, count in income_counts.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             html_content += f"""
                     <tr>
                         <td>{income_group}</td>
@@ -1243,7 +3748,7 @@ def generate_demographics_html(df):
         """
         
         for occupation, count in occupation_counts.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             html_content += f"""
                     <tr>
                         <td>{occupation}</td>
@@ -1270,12 +3775,12 @@ def generate_demographics_html(df):
 
 def generate_factors_html(df):
     """Generate HTML content for factors page"""
-    factor_cols = [c for c in df.columns if c.startswith("factor_")]
+    stats = get_page_stats("factors", df)
     
-    if not factor_cols:
+    if stats.factor_means.empty:
         return "<h2>ไม่พบข้อมูลปัจจัยการตัดสินใจ</h2>"
     
-    factor_means = df[factor_cols].mean().sort_values(ascending=False)
+    factor_means = stats.factor_means
     
     # Create charts
     charts_html = ""
@@ -1283,7 +3788,7 @@ def generate_factors_html(df):
     # Main factors bar chart
     try:
         import plotly.express as px
-        factor_names = [col.replace("factor_", "").replace("_", " ").title() for col in factor_means.index]
+        factor_names = [likert_display_name(col) for col in factor_means.index]
         
         fig_factors = px.bar(
             x=factor_means.values,
@@ -1292,7 +3797,8 @@ def generate_factors_html(df):
             title="คะแนนเฉลี่ยความสำคัญของปัจจัยต่างๆ (1-5)",
             labels={'x': 'คะแนนเฉลี่ย', 'y': 'ปัจจัย'},
             color=factor_means.values,
-            color_continuous_scale='RdYlGn'
+            color_continuous_scale='RdYlGn',
+            **ci_error_bars(factor_means, stats.factor_ci)
         )
         fig_factors.update_layout(height=600, font=dict(size=14), title=dict(font=dict(size=18)))
         
@@ -1304,10 +3810,8 @@ def generate_factors_html(df):
     
     # Factors by gender heatmap
     try:
-        gender_factors = df.groupby('gender')[factor_cols].mean()
-        
         fig_gender_factors = px.imshow(
-            gender_factors.T,
+            mark_significant(stats.gender_factors, stats.gender_markers).T,
             title="Heatmap: ความสำคัญของปัจจัยตามเพศ",
             labels=dict(x="เพศ", y="ปัจจัย", color="คะแนนเฉลี่ย"),
             aspect="auto",
@@ -1324,12 +3828,10 @@ def generate_factors_html(df):
         print(f"Error creating gender factors heatmap: {e}")
     
     # Factors by income heatmap
-    if 'income_group' in df.columns:
+    if stats.income_factors is not None:
         try:
-            income_factors = df.groupby('income_group', observed=False)[factor_cols].mean()
-            
             fig_income_factors = px.imshow(
-                income_factors.T,
+                mark_significant(stats.income_factors, stats.income_markers).T,
                 title="Heatmap: ความสำคัญของปัจจัยตามรายได้",
                 labels=dict(x="กลุ่มรายได้", y="ปัจจัย", color="คะแนนเฉลี่ย"),
                 aspect="auto",
@@ -1345,6 +3847,7 @@ def generate_factors_html(df):
         except Exception as e:
             print(f"Error creating income factors heatmap: {e}")
     
+    charts_html += f'<p><small>{SIGNIFICANCE_NOTE}</small></p>'
 
     
     html_content = f"""
@@ -1364,7 +3867,7 @@ def generate_factors_html(df):
     """
     
     for i, (factor, score) in enumerate(factor_means.items(), 1):
-        factor_name = factor.replace("factor_", "").replace("_", " ").title()
+        factor_name = likert_display_name(factor)
         
         # Determine importance level
         if score >= 4.5:
@@ -1399,7 +3902,7 @@ def generate_factors_html(df):
     """
     
     for i, (factor, score) in enumerate(top_3_factors.items(), 1):
-        factor_name = factor.replace("factor_", "").replace("_", " ").title()
+        factor_name = likert_display_name(factor)
         html_content += f"""
         <div class="insight-box">
             <h4>อันดับ {i}: {factor_name}</h4>
@@ -1418,15 +3921,15 @@ def generate_factors_html(df):
 
 def generate_products_html(df):
     """Generate HTML content for products page"""
+    stats = get_page_stats("products", df)
     html_content = "<h2>ความต้องการด้านผลิตภัณฑ์</h2>"
     
     # Create charts
     charts_html = ""
     
     # Style preferences
-    if 'preferred_styles' in df.columns:
-        style_long = explode_multiselect(df['preferred_styles'], clean_func=normalize_th)
-        style_counts = style_long['value'].value_counts().head(10)
+    if stats.style_counts is not None:
+        style_counts = stats.style_counts
         
         # Create style chart
         try:
@@ -1462,7 +3965,7 @@ def generate_products_html(df):
             <tbody>
         """
         
-        total_responses = len(df)
+        total_responses = stats.n_respondents
         for i, (style, count) in enumerate(style_counts.items(), 1):
             percentage = (count / total_responses) * 100
             html_content += f"""
@@ -1480,9 +3983,8 @@ def generate_products_html(df):
         """
     
     # Bag types
-    if 'used_bag_types' in df.columns:
-        bag_long = explode_multiselect(df['used_bag_types'], clean_func=normalize_th)
-        bag_counts = bag_long['value'].value_counts().head(8)
+    if stats.bag_counts is not None:
+        bag_counts = stats.bag_counts
         
         # Create bag types chart
         try:
@@ -1515,7 +4017,7 @@ def generate_products_html(df):
             <tbody>
         """
         
-        total_responses = len(df)
+        total_responses = stats.n_respondents
         for i, (bag_type, count) in enumerate(bag_counts.items(), 1):
             percentage = (count / total_responses) * 100
             html_content += f"""
@@ -1533,8 +4035,8 @@ def generate_products_html(df):
         """
     
     # Size preferences
-    if 'luggage_size_short_trip' in df.columns:
-        size_counts = df['luggage_size_short_trip'].value_counts()
+    if stats.size_counts is not None:
+        size_counts = stats.size_counts
         
         # Create size chart
         try:
@@ -1568,7 +4070,7 @@ def generate_products_html(df):
         """
         
         for size, count in size_counts.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             html_content += f"""
                 <tr>
                     <td>{size}</td>
@@ -1593,15 +4095,15 @@ def generate_products_html(df):
 
 def generate_pricing_html(df):
     """Generate HTML content for pricing page"""
+    stats = get_page_stats("pricing", df)
     html_content = "<h2>ความอ่อนไหวต่อราคา</h2>"
     
     # Create charts
     charts_html = ""
     
     # Price range preferences
-    price_col = 'preferred_price_range ' if 'preferred_price_range ' in df.columns else 'preferred_price_range'
-    if price_col in df.columns:
-        price_counts = df[price_col].value_counts()
+    if stats.price_counts is not None:
+        price_counts = stats.price_counts
         
         # Create price chart
         try:
@@ -1636,7 +4138,7 @@ def generate_pricing_html(df):
         """
         
         for price_range, count in price_counts.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             html_content += f"""
                 <tr>
                     <td>{price_range}</td>
@@ -1653,7 +4155,7 @@ def generate_pricing_html(df):
         # Most popular price insight
         most_popular_price = price_counts.index[0]
         most_popular_count = price_counts.iloc[0]
-        most_popular_pct = (most_popular_count / len(df)) * 100
+        most_popular_pct = (most_popular_count / stats.n_respondents) * 100
         
         html_content += f"""
         <div class="insight-box">
@@ -1663,20 +4165,11 @@ def generate_pricing_html(df):
         """
     
     # Price factors analysis
-    price_factor_cols = [c for c in df.columns if c.startswith("price_") and c not in ['price_midpoint', 'price_min', 'price_max', 'price_mid']]
-    
-    if price_factor_cols:
-        price_means = df[price_factor_cols].mean().sort_values(ascending=False)
-        
-        # Create Thai names for price factors
-        factor_name_mapping = {
-            'price_within_budget': 'อยู่ในงบประมาณ',
-            'price_value_for_quality': 'คุ้มค่าต่อคุณภาพ', 
-            'price_vs_competitor': 'เทียบกับคู่แข่ง',
-            'price_image_boost': 'เพิ่มภาพลักษณ์'
-        }
+    if not stats.price_means.empty:
+        price_means = stats.price_means
         
-        price_names = [factor_name_mapping.get(col, col.replace("price_", "").replace("_", " ").title()) for col in price_means.index]
+        # Display names come from the survey schema (Thai labels for price factors)
+        price_names = [likert_display_name(col) for col in price_means.index]
         
         # Create price factors chart
         try:
@@ -1687,7 +4180,8 @@ def generate_pricing_html(df):
                 title="ความสำคัญของปัจจัยด้านราคา (คะแนน 1-5)",
                 labels={'x': 'คะแนนเฉลี่ย', 'y': 'ปัจจัยด้านราคา'},
                 color=price_means.values,
-                color_continuous_scale='Blues'
+                color_continuous_scale='Blues',
+                **ci_error_bars(price_means, stats.price_ci)
             )
             fig_price_factors.update_layout(
                 xaxis=dict(range=[1, 5]),  # Set range for Likert scale
@@ -1717,7 +4211,7 @@ def generate_pricing_html(df):
         """
         
         for i, (factor, score) in enumerate(price_means.items(), 1):
-            factor_name = factor_name_mapping.get(factor, factor.replace("price_", "").replace("_", " ").title())
+            factor_name = likert_display_name(factor)
             
             # Determine importance level
             if score >= 4.5:
@@ -1746,69 +4240,64 @@ def generate_pricing_html(df):
         """
     
     # Price vs Income analysis
-    if 'income_group' in df.columns and price_col in df.columns:
-        # Clean data first - remove NaN income groups
-        clean_df = df.dropna(subset=['income_group', price_col])
+    if stats.price_income is not None:
+        price_income = stats.price_income
         
-        if len(clean_df) > 0:
-            # Cross-tabulation
-            price_income = pd.crosstab(clean_df['income_group'], clean_df[price_col])
-            
-            # Only proceed if we have data
-            if not price_income.empty and price_income.sum().sum() > 0:
-                try:
-                    fig_price_income = px.imshow(
-                        price_income.values,
-                        x=price_income.columns,
-                        y=price_income.index,
-                        title="ความสัมพันธ์ระหว่างรายได้กับช่วงราคาที่ต้องการ",
-                        labels=dict(x="ช่วงราคา", y="กลุ่มรายได้", color="จำนวนคน"),
-                        color_continuous_scale='Blues',
-                        text_auto=True
-                    )
-                    fig_price_income.update_traces(texttemplate="%{z}", textfont_size=12)
-                    fig_price_income.update_layout(
-                        xaxis={'side': 'bottom'},
-                        height=400,
-                        font=dict(size=14), 
-                        title=dict(font=dict(size=18))
-                    )
-                    
-                    price_income_img = plotly_to_base64(fig_price_income)
-                    if price_income_img:
-                        charts_html += f'<div style="text-align: center; margin: 30px 0;"><img src="{price_income_img}" style="max-width: 100%; height: auto;" alt="Price vs Income Heatmap"></div>'
-                except Exception as e:
-                    print(f"Error creating price vs income heatmap: {e}")
-                
-                # Add summary table
-                html_content += f"""
-                <h3>ราคา vs รายได้ - ตารางสรุป</h3>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>กลุ่มรายได้</th>
-                """
+        # Only proceed if we have data
+        if not price_income.empty and price_income.sum().sum() > 0:
+            try:
+                fig_price_income = px.imshow(
+                    price_income.values,
+                    x=price_income.columns,
+                    y=price_income.index,
+                    title="ความสัมพันธ์ระหว่างรายได้กับช่วงราคาที่ต้องการ",
+                    labels=dict(x="ช่วงราคา", y="กลุ่มรายได้", color="จำนวนคน"),
+                    color_continuous_scale='Blues',
+                    text_auto=True
+                )
+                fig_price_income.update_traces(texttemplate="%{z}", textfont_size=12)
+                fig_price_income.update_layout(
+                    xaxis={'side': 'bottom'},
+                    height=400,
+                    font=dict(size=14), 
+                    title=dict(font=dict(size=18))
+                )
                 
+                price_income_img = plotly_to_base64(fig_price_income)
+                if price_income_img:
+                    charts_html += f'<div style="text-align: center; margin: 30px 0;"><img src="{price_income_img}" style="max-width: 100%; height: auto;" alt="Price vs Income Heatmap"></div>'
+            except Exception as e:
+                print(f"Error creating price vs income heatmap: {e}")
+            
+            # Add summary table
+            html_content += f"""
+            <h3>ราคา vs รายได้ - ตารางสรุป</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th>กลุ่มรายได้</th>
+            """
+            
+            for price_range in price_income.columns:
+                html_content += f"<th>{price_range}</th>"
+            
+            html_content += """
+                    </tr>
+                </thead>
+                <tbody>
+            """
+            
+            for income_group in price_income.index:
+                html_content += f"<tr><td>{income_group}</td>"
                 for price_range in price_income.columns:
-                    html_content += f"<th>{price_range}</th>"
-                
-                html_content += """
-                        </tr>
-                    </thead>
-                    <tbody>
-                """
-                
-                for income_group in price_income.index:
-                    html_content += f"<tr><td>{income_group}</td>"
-                    for price_range in price_income.columns:
-                        value = price_income.loc[income_group, price_range]
-                        html_content += f"<td>{value}</td>"
-                    html_content += "</tr>"
-                
-                html_content += """
-                    </tbody>
-                </table>
-                """
+                    value = price_income.loc[income_group, price_range]
+                    html_content += f"<td>{value}</td>"
+                html_content += "</tr>"
+            
+            html_content += """
+                </tbody>
+            </table>
+            """
     
     # Add charts section
     html_content += f"""
@@ -1821,14 +4310,15 @@ def generate_pricing_html(df):
 
 def generate_channels_html(df):
     """Generate HTML content for channels page"""
+    stats = get_page_stats("channels", df)
     html_content = "<h2>ช่องทางการขาย</h2>"
     
     # Create charts
     charts_html = ""
     
     # Platform usage
-    if 'most_used_platform' in df.columns:
-        platform_counts = df['most_used_platform'].value_counts().head(10)
+    if stats.platform_counts is not None:
+        platform_counts = stats.platform_counts
         
         # Create platform pie chart
         try:
@@ -1863,7 +4353,7 @@ def generate_channels_html(df):
         """
         
         for i, (platform, count) in enumerate(platform_counts.items(), 1):
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             html_content += f"""
                 <tr>
                     <td>{i}</td>
@@ -1879,9 +4369,8 @@ def generate_channels_html(df):
         """
     
     # Purchase channels
-    if 'purchase_channels' in df.columns:
-        channel_long = explode_multiselect(df['purchase_channels'], clean_func=normalize_th)
-        channel_counts = channel_long['value'].value_counts().head(10)
+    if stats.channel_counts is not None:
+        channel_counts = stats.channel_counts
         
         # Create channels chart
         try:
@@ -1916,7 +4405,7 @@ def generate_channels_html(df):
             <tbody>
         """
         
-        total_responses = len(df)
+        total_responses = stats.n_respondents
         for i, (channel, count) in enumerate(channel_counts.items(), 1):
             percentage = (count / total_responses) * 100
             html_content += f"""
@@ -1947,17 +4436,15 @@ def generate_marketing_html(df):
     import plotly.express as px
     import pandas as pd
     
+    stats = get_page_stats("marketing", df)
     html_content = "<h2>การตลาด</h2>"
     
     # Promotion preferences
-    promo_cols = [c for c in df.columns if c.startswith("promo_")]
-    
-    if promo_cols:
+    if not stats.promo_means.empty:
         html_content += "<h3>ประสิทธิภาพของโปรโมชั่นแต่ละประเภท</h3>"
         
-        # Calculate average scores for each promotion type
-        promo_means = df[promo_cols].mean().sort_values(ascending=False)
-        promo_names = [col.replace("promo_", "").replace("_", " ").title() for col in promo_means.index]
+        promo_means = stats.promo_means
+        promo_names = [likert_display_name(col) for col in promo_means.index]
         
         # Create table
         html_content += """
@@ -1974,7 +4461,7 @@ def generate_marketing_html(df):
         """
         
         for i, (promo, score) in enumerate(promo_means.items(), 1):
-            promo_name = promo.replace("promo_", "").replace("_", " ").title()
+            promo_name = likert_display_name(promo)
             
             if score >= 4.5:
                 level = "ยอดเยี่ยม"
@@ -2010,7 +4497,8 @@ def generate_marketing_html(df):
                 title="คะแนนเฉลี่ยประสิทธิภาพโปรโมชั่น (1-5)",
                 labels={'x': 'คะแนนเฉลี่ย', 'y': 'ประเภทโปรโมชั่น'},
                 color=promo_means.values,
-                color_continuous_scale='RdYlGn'
+                color_continuous_scale='RdYlGn',
+                **ci_error_bars(promo_means, stats.promo_ci)
             )
             fig_promo.update_layout(
                 height=max(400, len(promo_names) * 40),  # Dynamic height based on number of items
@@ -2045,11 +4533,10 @@ def generate_marketing_html(df):
         """
     
     # Presenter preferences
-    if 'preferred_presenter' in df.columns:
+    if stats.presenter_counts is not None:
         html_content += "<h3>พรีเซนเตอร์ที่ต้องการ</h3>"
         
-        presenter_counts = df['preferred_presenter'].value_counts().head(10)
-        presenter_counts = presenter_counts[presenter_counts.index != '-']  # Remove empty values
+        presenter_counts = stats.presenter_counts
         
         if len(presenter_counts) > 0:
             # Create table
@@ -2107,13 +4594,14 @@ def generate_brand_awareness_html(df):
     import plotly.express as px
     import pandas as pd
     
+    stats = get_page_stats("brand_awareness", df)
     html_content = "<h2>Brand Awareness - T.Partner</h2>"
     
     # Brand recognition level
-    if 'know_tpartner' in df.columns:
+    if stats.awareness_counts is not None:
         html_content += "<h3>ระดับการรู้จักแบรนด์ T.Partner</h3>"
         
-        awareness_counts = df['know_tpartner'].value_counts()
+        awareness_counts = stats.awareness_counts
         
         # Create table first
         html_content += """
@@ -2128,7 +4616,7 @@ def generate_brand_awareness_html(df):
             <tbody>
         """
         
-        total_respondents = len(df)
+        total_respondents = stats.n_respondents
         for awareness_level, count in awareness_counts.items():
             percentage = (count / total_respondents) * 100
             html_content += f"""
@@ -2160,10 +4648,9 @@ def generate_brand_awareness_html(df):
         except Exception as e:
             print(f"Error creating awareness chart: {e}")
         
-        # Calculate key metrics
-        know_brand = (df['know_tpartner'] == 'รู้จัก และรู้ว่าเป็นแบรนด์กระเป๋าเดินทาง').sum()
-        seen_before = (df['know_tpartner'] == 'เคยเห็นผ่านตา แต่ไม่แน่ใจว่าแบรนด์ทำอะไร').sum()
-        never_heard = (df['know_tpartner'] == 'ไม่รู้จักมาก่อนเลย').sum()
+        know_brand = stats.know_brand
+        seen_before = stats.seen_before
+        never_heard = stats.never_heard
         
         html_content += f"""
         <div class="metric-card">
@@ -2178,13 +4665,8 @@ def generate_brand_awareness_html(df):
     if 'tpartner_first_channel' in df.columns:
         html_content += "<h3>📡 ช่องทางที่รู้จักแบรนด์ครั้งแรก</h3>"
         
-        # Filter out non-responses
-        first_channel_data = df[df['tpartner_first_channel'].notna() & 
-                                (df['tpartner_first_channel'] != '') & 
-                                (df['tpartner_first_channel'] != '-')]
-        
-        if len(first_channel_data) > 0:
-            channel_counts = first_channel_data['tpartner_first_channel'].value_counts().head(10)
+        if stats.first_channel_counts is not None:
+            channel_counts = stats.first_channel_counts
             
             # Create table
             html_content += """
@@ -2200,7 +4682,7 @@ def generate_brand_awareness_html(df):
                 <tbody>
             """
             
-            total_responses = len(first_channel_data)
+            total_responses = stats.first_channel_responses
             for i, (channel, count) in enumerate(channel_counts.items(), 1):
                 percentage = (count / total_responses) * 100
                 html_content += f"""
@@ -2253,18 +4735,15 @@ def generate_brand_image_html(df):
     import plotly.express as px
     import pandas as pd
     
+    stats = get_page_stats("brand_image", df)
     html_content = "<h2>🏢 Brand Image & Barriers to Purchase</h2>"
     
     # Brand positioning perception
     if 'tpartner_positioning' in df.columns:
         html_content += "<h3>การรับรู้ positioning ของแบรนด์</h3>"
         
-        positioning_data = df[df['tpartner_positioning'].notna() & 
-                             (df['tpartner_positioning'] != '') & 
-                             (df['tpartner_positioning'] != '-')]
-        
-        if len(positioning_data) > 0:
-            positioning_counts = positioning_data['tpartner_positioning'].value_counts().head(8)
+        if stats.positioning_counts is not None:
+            positioning_counts = stats.positioning_counts
             
             # Create table
             html_content += """
@@ -2280,7 +4759,7 @@ def generate_brand_image_html(df):
                 <tbody>
             """
             
-            total_positioning = len(positioning_data)
+            total_positioning = stats.positioning_responses
             for i, (positioning, count) in enumerate(positioning_counts.items(), 1):
                 percentage = (count / total_positioning) * 100
                 html_content += f"""
@@ -2319,34 +4798,8 @@ def generate_brand_image_html(df):
     
     # First impression sentiment analysis
     if 'first_impression' in df.columns:
-        impression_data = df[df['first_impression'].notna() & 
-                           (df['first_impression'] != '') & 
-                           (df['first_impression'] != '-')]
-        
-        if len(impression_data) > 0:
-            # Simple sentiment analysis based on keywords
-            positive_keywords = ['ดี', 'สวย', 'น่าสนใจ', 'ชอบ', 'ทันสมัย', 'หรู', 'คุณภาพ']
-            neutral_keywords = ['เรียบ', 'ธรรมดา', 'ปกติ', 'กลางๆ']
-            negative_keywords = ['ไม่', 'แพง', 'เก่า', 'น่าเบื่อ']
-            
-            def classify_sentiment(text):
-                if pd.isna(text):
-                    return 'ไม่ระบุ'
-                text = str(text).lower()
-                
-                positive_score = sum(1 for word in positive_keywords if word in text)
-                negative_score = sum(1 for word in negative_keywords if word in text)
-                
-                if positive_score > negative_score:
-                    return 'เชิงบวก'
-                elif negative_score > positive_score:
-                    return 'เชิงลบ'
-                else:
-                    return 'กลางๆ'
-            
-            impression_data = impression_data.copy()
-            impression_data['sentiment'] = impression_data['first_impression'].apply(classify_sentiment)
-            sentiment_counts = impression_data['sentiment'].value_counts()
+        if stats.sentiment_counts is not None:
+            sentiment_counts = stats.sentiment_counts
             
             # Create sentiment table
             html_content += "<h4>การวิเคราะห์ First Impression</h4>"
@@ -2362,7 +4815,7 @@ def generate_brand_image_html(df):
                 <tbody>
             """
             
-            total_impressions = len(impression_data)
+            total_impressions = sentiment_counts.sum()
             for sentiment, count in sentiment_counts.items():
                 percentage = (count / total_impressions) * 100
                 html_content += f"""
@@ -2398,9 +4851,9 @@ def generate_brand_image_html(df):
                 print(f"Error creating sentiment chart: {e}")
     
     # Purchase consideration
-    if 'considered_tpartner' in df.columns:
+    if stats.considered_counts is not None:
         html_content += "<h4>🤔 การพิจารณาซื้อแบรนด์ T.Partner</h4>"
-        considered_counts = df['considered_tpartner'].value_counts()
+        considered_counts = stats.considered_counts
         
         # Create table
         html_content += """
@@ -2415,7 +4868,7 @@ def generate_brand_image_html(df):
             <tbody>
         """
         
-        total_considered = len(df)
+        total_considered = stats.n_respondents
         for consideration, count in considered_counts.items():
             percentage = (count / total_considered) * 100
             html_content += f"""
@@ -2450,13 +4903,8 @@ def generate_brand_image_html(df):
     if 'reason_not_chosen' in df.columns:
         html_content += "<h3>🚧 เหตุผลที่ยังไม่ซื้อ / Barriers to Purchase</h3>"
         
-        barrier_data = df[df['reason_not_chosen'].notna() & 
-                         (df['reason_not_chosen'] != '') & 
-                         (df['reason_not_chosen'] != '-')]
-        
-        if len(barrier_data) > 0:
-            # Count common barriers
-            barrier_counts = barrier_data['reason_not_chosen'].value_counts().head(10)
+        if stats.barrier_counts is not None:
+            barrier_counts = stats.barrier_counts
             
             # Create table
             html_content += """
@@ -2472,7 +4920,7 @@ def generate_brand_image_html(df):
                 <tbody>
             """
             
-            total_barriers = len(barrier_data)
+            total_barriers = stats.barrier_responses
             for i, (barrier, count) in enumerate(barrier_counts.items(), 1):
                 percentage = (count / total_barriers) * 100
                 html_content += f"""
@@ -2522,10 +4970,9 @@ def generate_brand_image_html(df):
             # Actionable insights
             html_content += "<h3>ข้อเสนอแนะเชิงกลยุทธ์</h3>"
             
-            # Analyze barriers and provide recommendations
-            price_related = barrier_data['reason_not_chosen'].str.contains('แพง|ราคา|คุ้ม', case=False, na=False).sum()
-            quality_related = barrier_data['reason_not_chosen'].str.contains('คุณภาพ|ทน|รีวิว', case=False, na=False).sum()
-            availability_related = barrier_data['reason_not_chosen'].str.contains('หา|ซื้อ|ไม่รู้', case=False, na=False).sum()
+            price_related = stats.barrier_theme_counts['price']
+            quality_related = stats.barrier_theme_counts['quality']
+            availability_related = stats.barrier_theme_counts['availability']
             
             html_content += f"""
             <div style="display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 20px; margin: 20px 0;">
@@ -2555,6 +5002,7 @@ def generate_personas_html(df):
     import pandas as pd
     import numpy as np
     
+    stats = get_page_stats("personas", df)
     html_content = "<h2>👥 Customer Personas - การวิเคราะห์กลุ่มลูกค้าเชิงลึก</h2>"
     
     html_content += """
@@ -2564,41 +5012,11 @@ def generate_personas_html(df):
     </div>
     """
     
-    # Prepare data for clustering
-    factor_cols = [c for c in df.columns if c.startswith('factor_')]
-    price_cols = [c for c in df.columns if c.startswith('price_') and c not in ['price_midpoint', 'price_min', 'price_max', 'price_mid']]
-    channel_cols = [c for c in df.columns if c.startswith('channel_')]
-    promo_cols = [c for c in df.columns if c.startswith('promo_')]
-    
     # Create persona analysis
     html_content += "<h3>การวิเคราะห์แบบกลุ่ม (Cluster Analysis)</h3>"
     
-    # Prepare numerical data for clustering
-    df_analysis = df.copy()
-    
-    # Calculate key scores
-    df_analysis['quality_focus'] = df_analysis[['factor_durability', 'factor_warranty', 'price_value_for_quality']].mean(axis=1)
-    df_analysis['price_sensitive'] = df_analysis[['price_within_budget', 'promo_discount']].mean(axis=1)
-    df_analysis['brand_conscious'] = df_analysis[['factor_brand_trust', 'price_image_boost']].mean(axis=1)
-    df_analysis['convenience_focus'] = df_analysis[['channel_fast_shipping', 'channel_easy_to_find']].mean(axis=1)
-    
-    # Create persona categories
-    def categorize_persona(row):
-        if row['quality_focus'] >= 4.5 and row['price_sensitive'] <= 3.5:
-            return "Premium Quality Seeker"
-        elif row['price_sensitive'] >= 4.5 and row['quality_focus'] >= 4.0:
-            return "Value Hunter"
-        elif row['brand_conscious'] >= 4.0:
-            return "Brand Loyalist" 
-        elif row['convenience_focus'] >= 4.5:
-            return "Convenience Lover"
-        else:
-            return "Practical Buyer"
-    
-    df_analysis['persona_type'] = df_analysis.apply(categorize_persona, axis=1)
-    
     # Show persona distribution
-    persona_counts = df_analysis['persona_type'].value_counts()
+    persona_counts = stats.persona_counts
     
     # Create persona distribution table
     html_content += """
@@ -2622,7 +5040,7 @@ def generate_personas_html(df):
         "Practical Buyer": "เน้นความเป็นจริงและการใช้งาน"
     }
     
-    total_respondents = len(df_analysis)
+    total_respondents = stats.n_respondents
     for persona_name, count in persona_counts.items():
         percentage = (count / total_respondents) * 100
         description = persona_descriptions.get(persona_name, "")
@@ -2658,7 +5076,7 @@ def generate_personas_html(df):
     # Price vs Quality Matrix
     try:
         fig_matrix = px.scatter(
-            df_analysis,
+            stats.scores,
             x='price_sensitive',
             y='quality_focus',
             color='persona_type',
@@ -2680,10 +5098,9 @@ def generate_personas_html(df):
     # Detailed Persona Profiles
     html_content += "<h3>รายละเอียด Persona แต่ละกลุ่ม</h3>"
     
-    for persona_name in persona_counts.index:
-        persona_df = df_analysis[df_analysis['persona_type'] == persona_name]
-        persona_count = persona_counts[persona_name]
-        persona_percent = persona_count/len(df)*100
+    for persona_name, profile in stats.profiles.items():
+        persona_count = profile.count
+        persona_percent = persona_count/stats.n_respondents*100
         
         html_content += f"""
         <div style="border: 2px solid #ddd; border-radius: 10px; padding: 20px; margin: 20px 0; background-color: #f9f9f9;">
@@ -2694,57 +5111,51 @@ def generate_personas_html(df):
         """
         
         # Demographics
-        gender_dist = persona_df['gender'].value_counts()
-        avg_age = persona_df['age'].mean()
-        top_income = persona_df['monthly_income'].mode().iloc[0] if len(persona_df) > 0 else "ไม่ระบุ"
-        
         html_content += f"""
             <div>
                 <h5 style="color: #e74c3c;">Demographics</h5>
-                <p>• <strong>เพศหลัก:</strong> {gender_dist.index[0]} ({gender_dist.iloc[0]} คน)</p>
-                <p>• <strong>อายุเฉลี่ย:</strong> {avg_age:.0f} ปี</p>
-                <p>• <strong>รายได้หลัก:</strong> {top_income}</p>
+                <p>• <strong>เพศหลัก:</strong> {profile.top_gender} ({profile.top_gender_count} คน)</p>
+                <p>• <strong>อายุเฉลี่ย:</strong> {profile.avg_age:.0f} ปี</p>
+                <p>• <strong>รายได้หลัก:</strong> {profile.top_income}</p>
                 
                 <h5 style="color: #e74c3c;">พฤติกรรม</h5>
         """
         
-        if 'luggage_frequency' in persona_df.columns:
-            top_freq = persona_df['luggage_frequency'].mode().iloc[0] if len(persona_df) > 0 else "ไม่ระบุ"
-            html_content += f"<p>• <strong>ความถี่ใช้งาน:</strong> {top_freq}</p>"
+        if profile.top_frequency is not None:
+            html_content += f"<p>• <strong>ความถี่ใช้งาน:</strong> {profile.top_frequency}</p>"
         
-        if 'most_used_platform' in persona_df.columns:
-            top_platform = persona_df['most_used_platform'].mode().iloc[0] if len(persona_df) > 0 else "ไม่ระบุ"
-            html_content += f"<p>• <strong>แพลตฟอร์มหลัก:</strong> {top_platform}</p>"
+        if profile.top_platform is not None:
+            html_content += f"<p>• <strong>แพลตฟอร์มหลัก:</strong> {profile.top_platform}</p>"
         
         html_content += "</div><div>"
         
         # Values & Beliefs
         html_content += "<h5 style='color: #27ae60;'>ความเชื่อ & ค่านิยม</h5>"
-        factor_scores = persona_df[factor_cols].mean().sort_values(ascending=False)
+        factor_scores = profile.factor_scores
         html_content += "<p><strong>ปัจจัยสำคัญ Top 3:</strong></p>"
         for i, (factor, score) in enumerate(factor_scores.head(3).items()):
-            factor_name = factor.replace('factor_', '').replace('_', ' ').title()
+            factor_name = likert_display_name(factor)
             html_content += f"<p>{i+1}. {factor_name}: {score:.1f}/5</p>"
         
         html_content += "<h5 style='color: #27ae60;'>ความอ่อนไหวต่อราคา</h5>"
-        price_scores = persona_df[price_cols].mean().sort_values(ascending=False)
+        price_scores = profile.price_scores
         for factor, score in price_scores.head(2).items():
-            factor_name = factor.replace('price_', '').replace('_', ' ').title()
+            factor_name = likert_display_name(factor)
             html_content += f"<p>• {factor_name}: {score:.1f}/5</p>"
         
         html_content += "</div><div>"
         
         # Channels & Marketing
         html_content += "<h5 style='color: #9b59b6;'>ช่องทางที่ต้องการ</h5>"
-        channel_scores = persona_df[channel_cols].mean().sort_values(ascending=False)
+        channel_scores = profile.channel_scores
         for factor, score in channel_scores.head(3).items():
-            factor_name = factor.replace('channel_', '').replace('_', ' ').title()
+            factor_name = likert_display_name(factor)
             html_content += f"<p>• {factor_name}: {score:.1f}/5</p>"
         
         html_content += "<h5 style='color: #9b59b6;'>การตลาดที่ได้ผล</h5>"
-        promo_scores = persona_df[promo_cols].mean().sort_values(ascending=False)
+        promo_scores = profile.promo_scores
         for factor, score in promo_scores.head(2).items():
-            factor_name = factor.replace('promo_', '').replace('_', ' ').title()
+            factor_name = likert_display_name(factor)
             html_content += f"<p>• {factor_name}: {score:.1f}/5</p>"
         
         html_content += "</div></div></div>"
@@ -2806,8 +5217,8 @@ def generate_personas_html(df):
     
     return html_content
 
-def export_current_page_to_pdf(page_name, df):
-    """Export current page to PDF"""
+def export_current_page_to_pdf(page_name, df, progress=None):
+    """Export current page to PDF (progress(step[, chart_report]) is called after each finished step)"""
     # Check PDF availability at runtime
     try:
         from weasyprint import HTML, CSS
@@ -2816,8 +5227,14 @@ def export_current_page_to_pdf(page_name, df):
         return None, f"ไม่พบไลบรารี PDF: {str(e)} - กรุณาติดตั้ง weasyprint และ jinja2"
     
     try:
-        # Get page content as HTML
-        content_html = get_page_content_as_html(page_name, df)
+        # Get page content as HTML (its charts are rasterized together at the end)
+        with chart_batch() as charts:
+            content_html = get_page_content_as_html(page_name, df)
+            if progress:
+                progress(page_name)
+        content_html = charts.fill(content_html)
+        if progress:
+            progress("กราฟ", charts.report)
         
         # Create template and render
         template = create_pdf_template()
@@ -2833,7 +5250,7 @@ def export_current_page_to_pdf(page_name, df):
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
             HTML(string=html_content).write_pdf(
                 tmp_file.name,
-                stylesheets=[CSS(string='@page { size: A4 landscape; margin: 2cm; }')]
+                stylesheets=[CSS(string=PDF_PAGE_CSS)]
             )
             
             # Read PDF content
@@ -2843,31 +5260,240 @@ def export_current_page_to_pdf(page_name, df):
             # Clean up
             os.unlink(tmp_file.name)
             
+            if progress:
+                progress("PDF")
             return pdf_bytes, None
     
+    except PdfJobCancelled:
+        raise
     except Exception as e:
         return None, f"เกิดข้อผิดพลาดในการสร้าง PDF: {str(e)}"
 
+# Background PDF exports: jobs run on a small worker-thread pool instead of inside the script run,
+# report progress per section and can be cancelled between sections; jobs are keyed by (page, data
+# version, filter selection) across sessions, so a PDF any session finished is served to every
+# session asking for the same export. Progress and cancel belong to the sessions that asked for a
+# job: other sessions see only its finished result, and a cancel stops the job only once no other
+# session is still waiting for it
+COMPLETE_REPORT = "รายงานฉบับสมบูรณ์"
+PDF_JOB_WORKERS = 2
+PDF_RESULT_CACHE_ENTRIES = 16
+PDF_JOB_POLL_SECONDS = 1
+PDF_JOB_ACTIVE = ("queued", "running")
+
+class PdfJobCancelled(Exception):
+    """Raised from a job's progress callback once cancellation was requested"""
+
+@dataclass
+class PdfJob:
+    """One background PDF export and its progress"""
+    page_name: str
+    total: int
+    status: str = "queued"
+    done: int = 0
+    step: str = ""
+    pdf_bytes: bytes = None
+    error: str = None
+    chart_report: dict = field(default_factory=dict)
+    sessions: set = field(default_factory=set)
+    cancel: threading.Event = field(default_factory=threading.Event)
+    
+    def progress(self, step, chart_report=None):
+        """Record a finished step (and the charts' render report); stops the export here if it was cancelled"""
+        if self.cancel.is_set():
+            raise PdfJobCancelled()
+        self.done += 1
+        self.step = step
+        if chart_report:
+            self.chart_report = dict(chart_report)
+
+@st.cache_resource
+def _pdf_jobs():
+    """Process-wide PDF job queue: worker threads and jobs in least recently used order"""
+    return {"executor": ThreadPoolExecutor(max_workers=PDF_JOB_WORKERS), "jobs": OrderedDict(), "lock": threading.Lock()}
+
+def pdf_session_id():
+    """Id of the current browser session, owning the PDF jobs it asked for"""
+    if "pdf_session_id" not in st.session_state:
+        st.session_state["pdf_session_id"] = uuid.uuid4().hex
+    return st.session_state["pdf_session_id"]
+
+def pdf_job_key(page_name, df):
+    """Result key of an export: page, data version, filter selection and chart format"""
+    return (page_name, df.attrs.get("data_version"), df.attrs.get("selection_key", ""), CHART_EXPORT_FORMAT)
+
+def _run_pdf_job(job, df):
+    """Worker body: render the export and record its outcome on the job"""
+    if job.cancel.is_set():
+        job.status = "cancelled"
+        return
+    job.status = "running"
+    try:
+        if job.page_name == COMPLETE_REPORT:
+            pdf_bytes, error = export_complete_report_to_pdf(df, job.progress)
+        else:
+            pdf_bytes, error = export_current_page_to_pdf(job.page_name, df, job.progress)
+    except PdfJobCancelled:
+        pdf_bytes, error = None, None
+    except Exception as e:
+        pdf_bytes, error = None, f"เกิดข้อผิดพลาดในการสร้าง PDF: {str(e)}"
+        print(f"PDF job error ({job.page_name}): {e}")
+    
+    if job.cancel.is_set():
+        job.status = "cancelled"
+    elif error or not pdf_bytes:
+        job.error = error or "ไม่สามารถสร้าง PDF ได้"
+        job.status = "failed"
+    else:
+        job.pdf_bytes = pdf_bytes
+        job.status = "done"
+
+def get_pdf_job(page_name, df):
+    """Latest job of an export this session asked for, or any session's finished one; else None"""
+    key = pdf_job_key(page_name, df)
+    session = pdf_session_id()
+    jobs = _pdf_jobs()
+    with jobs["lock"]:
+        job = jobs["jobs"].get(key)
+        if job is None or (job.status != "done" and session not in job.sessions):
+            return None
+        jobs["jobs"].move_to_end(key)
+        return job
+
+def submit_pdf_job(page_name, df):
+    """Queue an export unless the same one is already running or finished"""
+    key = pdf_job_key(page_name, df)
+    session = pdf_session_id()
+    jobs = _pdf_jobs()
+    with jobs["lock"]:
+        job = jobs["jobs"].get(key)
+        if job is not None and job.status in PDF_JOB_ACTIVE + ("done",):
+            # Another session's export of the same selection: follow it instead of rendering again
+            job.sessions.add(session)
+            return job
+        
+        total = 2 * len(COMPLETE_REPORT_SECTIONS) + 2 if page_name == COMPLETE_REPORT else 3
+        job = PdfJob(page_name, total, sessions={session})
+        jobs["jobs"][key] = job
+        jobs["jobs"].move_to_end(key)
+        
+        # Only the most recently used finished exports keep their PDFs
+        finished = [k for k, j in jobs["jobs"].items() if j.status not in PDF_JOB_ACTIVE]
+        for k in finished[:max(0, len(finished) - PDF_RESULT_CACHE_ENTRIES)]:
+            del jobs["jobs"][k]
+        
+        jobs["executor"].submit(_run_pdf_job, job, df)
+        return job
+
+def cancel_pdf_job(page_name, df):
+    """Withdraw this session from a queued or running export; the last session left stops it"""
+    session = pdf_session_id()
+    job = get_pdf_job(page_name, df)
+    if job is None or job.status not in PDF_JOB_ACTIVE:
+        return
+    with _pdf_jobs()["lock"]:
+        if session not in job.sessions:
+            return
+        if len(job.sessions) > 1:
+            # Other sessions still wait for this PDF: only this one stops following it
+            job.sessions.discard(session)
+            return
+        job.cancel.set()
+        if job.status == "queued":
+            job.status = "cancelled"
+
+def pdf_export_controls(page_name, df, label, key, download_key, file_stem, help=None):
+    """Export button, live progress with cancel, and download of a background PDF job"""
+    job = get_pdf_job(page_name, df)
+    active = job is not None and job.status in PDF_JOB_ACTIVE
+    
+    @st.fragment(run_every=PDF_JOB_POLL_SECONDS if active else None)
+    def controls():
+        job = get_pdf_job(page_name, df)
+        if job is not None and job.status in PDF_JOB_ACTIVE:
+            if not active:
+                # Queued since the page was drawn: redraw the page with polling
+                st.rerun()
+            step = f" ({job.step})" if job.step else ""
+            st.progress(job.done / job.total, text=f"กำลังสร้าง PDF... {job.done}/{job.total}{step}")
+            if st.button("ยกเลิก", key=f"{key}_cancel"):
+                cancel_pdf_job(page_name, df)
+                st.rerun()
+            return
+        if active:
+            # Finished since the page was drawn: redraw the page without polling
+            st.rerun()
+        
+        if job is not None and job.status == "done":
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            st.download_button(
+                label="Download PDF",
+                data=job.pdf_bytes,
+                file_name=f"{file_stem}_{timestamp}.pdf",
+                mime="application/pdf",
+                key=download_key
+            )
+            st.success(f"สร้าง PDF สำเร็จ! ({len(job.pdf_bytes)/1024:.1f} KB)")
+            if job.chart_report:
+                # Per-format chart counts, bytes and render time (vector charts that fell back show under PNG)
+                st.caption(f"กราฟ: {chart_report_text(job.chart_report)}")
+            return
+        
+        if job is not None and job.status == "failed":
+            st.error(job.error)
+        elif job is not None and job.status == "cancelled":
+            st.info("ยกเลิกการสร้าง PDF แล้ว")
+        if st.button(label, key=key, help=help):
+            submit_pdf_job(page_name, df)
+            st.rerun()
+    
+    controls()
+
 def create_pdf_download_button(page_name, df):
     """Create PDF download button for current page"""
-    if st.button(f"Export หน้า '{page_name}' เป็น PDF", key=f"pdf_export_{page_name}"):
-        with st.spinner("กำลังสร้าง PDF..."):
-            pdf_bytes, error = export_current_page_to_pdf(page_name, df)
-            
-            if error:
-                st.error(error)
-            elif pdf_bytes:
-                # Create download button
-                b64_pdf = base64.b64encode(pdf_bytes).decode()
-                filename = f"suitcase_insights_{page_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                
-                href = f'<a href="data:application/octet-stream;base64,{b64_pdf}" download="{filename}">คลิกที่นี่เพื่อดาวน์โหลด PDF</a>'
-                st.markdown(href, unsafe_allow_html=True)
-                st.success("สร้าง PDF สำเร็จ! คลิกลิงค์ด้านบนเพื่อดาวน์โหลด")
+    pdf_export_controls(
+        page_name, df,
+        label=f"Export หน้า '{page_name}' เป็น PDF",
+        key=f"pdf_export_{page_name}",
+        download_key=f"pdf_download_{page_name}",
+        file_stem=f"suitcase_insights_{page_name}"
+    )
+
+# Sections of the complete report, in order
+COMPLETE_REPORT_SECTIONS = [
+    ("1. ภาพรวม", generate_overview_html),
+    ("2. ข้อมูลประชากร", generate_demographics_html),
+    ("3. ปัจจัยในการตัดสินใจ", generate_factors_html),
+    ("4. ความชอบสินค้า", generate_products_html),
+    ("5. ความอ่อนไหวต่อราคา", generate_pricing_html),
+    ("6. ช่องทางการขาย", generate_channels_html),
+    ("7. การตลาด", generate_marketing_html),
+    ("8. การรู้จักแบรนด์", generate_brand_awareness_html),
+    ("9. ภาพลักษณ์แบรนด์", generate_brand_image_html),
+    ("10. กลุ่มลูกค้า", generate_personas_html)
+]
 
-def generate_complete_report_html(df):
-    """Generate HTML content for complete report with all pages"""
-    html_content = """
+# Table-of-contents labels of the complete report sections (same order as COMPLETE_REPORT_SECTIONS)
+COMPLETE_REPORT_TOC = [
+    ("1. ภาพรวม (Overview)", "................................."),
+    ("2. ข้อมูลประชากร (Demographics)", "...................."),
+    ("3. ปัจจัยในการตัดสินใจ (Decision Factors)", "........."),
+    ("4. ความชอบสินค้า (Product Preferences)", ".........."),
+    ("5. ความอ่อนไหวต่อราคา (Price Sensitivity)", "........"),
+    ("6. ช่องทางการขาย (Sales Channels)", "................"),
+    ("7. การตลาด (Marketing Preferences)", "..............."),
+    ("8. การรู้จักแบรนด์ (Brand Awareness)", ".............."),
+    ("9. ภาพลักษณ์แบรนด์ (Brand Image & Barriers)", "..."),
+    ("10. กลุ่มลูกค้า (Customer Personas)", "...............")
+]
+
+def complete_report_front_html(section_pages):
+    """Cover and table of contents of the complete report, given each section's first page"""
+    toc = "\n".join(
+        f"            <p><strong>{label}</strong> {leader} หน้า {page}</p>"
+        for (label, leader), page in zip(COMPLETE_REPORT_TOC, section_pages)
+    )
+    return """
     <div style="text-align: center; margin-bottom: 40px;">
         <h1 style="color: #2c3e50; font-size: 2.5em; margin-bottom: 10px;">Suitcase Insights Report</h1>
         <h2 style="color: #7f8c8d; font-size: 1.5em; margin-bottom: 30px;">การวิเคราะห์พฤติกรรมผู้บริโภคกระเป๋าเดินทางแบบครบถ้วน</h2>
@@ -2879,38 +5505,14 @@ def generate_complete_report_html(df):
     <div style="margin-bottom: 40px;">
         <h2 style="color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px;">สารบัญ</h2>
         <div style="margin-left: 20px; line-height: 2;">
-            <p><strong>1. ภาพรวม (Overview)</strong> ................................. หน้า 3</p>
-            <p><strong>2. ข้อมูลประชากร (Demographics)</strong> .................... หน้า 4</p>
-            <p><strong>3. ปัจจัยในการตัดสินใจ (Decision Factors)</strong> ......... หน้า 5</p>
-            <p><strong>4. ความชอบสินค้า (Product Preferences)</strong> .......... หน้า 6</p>
-            <p><strong>5. ความอ่อนไหวต่อราคา (Price Sensitivity)</strong> ........ หน้า 7</p>
-            <p><strong>6. ช่องทางการขาย (Sales Channels)</strong> ................ หน้า 8</p>
-            <p><strong>7. การตลาด (Marketing Preferences)</strong> ............... หน้า 9</p>
-            <p><strong>8. การรู้จักแบรนด์ (Brand Awareness)</strong> .............. หน้า 10</p>
-            <p><strong>9. ภาพลักษณ์แบรนด์ (Brand Image & Barriers)</strong> ... หน้า 11</p>
-            <p><strong>10. กลุ่มลูกค้า (Customer Personas)</strong> ............... หน้า 12</p>
+""" + toc + """
         </div>
     </div>
-    
-    <div style="page-break-after: always;"></div>
     """
-    
-    # Add each page with page breaks
-    pages = [
-        ("1. ภาพรวม", generate_overview_html(df)),
-        ("2. ข้อมูลประชากร", generate_demographics_html(df)),
-        ("3. ปัจจัยในการตัดสินใจ", generate_factors_html(df)),
-        ("4. ความชอบสินค้า", generate_products_html(df)),
-        ("5. ความอ่อนไหวต่อราคา", generate_pricing_html(df)),
-        ("6. ช่องทางการขาย", generate_channels_html(df)),
-        ("7. การตลาด", generate_marketing_html(df)),
-        ("8. การรู้จักแบรนด์", generate_brand_awareness_html(df)),
-        ("9. ภาพลักษณ์แบรนด์", generate_brand_image_html(df)),
-        ("10. กลุ่มลูกค้า", generate_personas_html(df))
-    ]
-    
-    for i, (title, content) in enumerate(pages):
-        html_content += f"""
+
+def complete_report_section_html(title, content):
+    """One titled section of the complete report"""
+    return f"""
         <div style="margin-bottom: 30px;">
             <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
                 <h1 style="margin: 0; font-size: 2em;">{title}</h1>
@@ -2918,12 +5520,92 @@ def generate_complete_report_html(df):
             {content}
         </div>
         """
+
+def complete_report_sections(df, progress=None):
+    """(title, html) of every complete report section; all sections' charts are rendered in one batch"""
+    with chart_batch() as charts:
+        pages = []
+        for title, generate_html in COMPLETE_REPORT_SECTIONS:
+            pages.append((title, generate_html(df)))
+            if progress:
+                progress(title)
+    
+    pages = [(title, charts.fill(content)) for title, content in pages]
+    if progress:
+        progress("กราฟ", charts.report)
+    return pages
+
+# Complete report sections are laid out as separate WeasyPrint documents, kept by a hash of their
+# final HTML, so a regenerated report only lays out the sections whose content changed; the
+# documents' page counts number the table of contents
+PDF_SECTION_CACHE_ENTRIES = 64
+
+@st.cache_resource
+def _pdf_section_cache():
+    """Process-wide laid-out section documents in least recently used order"""
+    return {"documents": OrderedDict(), "lock": threading.Lock()}
+
+def render_pdf_section(html):
+    """Laid-out document of one report section, reused while its HTML is unchanged"""
+    key = hashlib.sha256((PDF_PAGE_CSS + html).encode()).hexdigest()
+    cache = _pdf_section_cache()
+    with cache["lock"]:
+        document = cache["documents"].get(key)
+        if document is not None:
+            cache["documents"].move_to_end(key)
+            return document
+    
+    document = HTML(string=html).render(stylesheets=[CSS(string=PDF_PAGE_CSS)])
+    with cache["lock"]:
+        cache["documents"][key] = document
+        while len(cache["documents"]) > PDF_SECTION_CACHE_ENTRIES:
+            cache["documents"].popitem(last=False)
+    return document
+
+def export_complete_report_to_pdf(df, progress=None):
+    """Export the complete report to PDF (progress(step[, chart_report]) is called after each finished step)"""
+    try:
+        pages = complete_report_sections(df, progress)
+        template = create_pdf_template()
+        report = dict(
+            title="Suitcase Insights - Complete Report",
+            subtitle="การวิเคราะห์พฤติกรรมผู้บริโภคกระเป๋าเดินทางแบบครบถ้วน",
+            date=pd.Timestamp.now().strftime("%d/%m/%Y %H:%M"),
+            current_year=pd.Timestamp.now().year
+        )
         
-        # Add page break except for the last page
-        if i < len(pages) - 1:
-            html_content += '<div style="page-break-after: always;"></div>'
-    
-    return html_content
+        # Each section is its own document: the report header opens the cover, the footer closes the last section
+        sections = []
+        for i, (title, content) in enumerate(pages):
+            section_html = template.render(
+                content=complete_report_section_html(title, content),
+                hide_header=True, hide_footer=i < len(pages) - 1, **report
+            )
+            sections.append(render_pdf_section(section_html))
+            if progress:
+                progress(f"PDF {title}")
+        
+        # Contents page numbers from the section page counts; the cover is laid out again if its own length changes
+        front_pages = 2
+        for _ in range(2):
+            starts = np.cumsum([front_pages + 1] + [len(section.pages) for section in sections[:-1]])
+            front = HTML(string=template.render(
+                content=complete_report_front_html(starts), hide_footer=True, **report
+            )).render(stylesheets=[CSS(string=PDF_PAGE_CSS)])
+            if len(front.pages) == front_pages:
+                break
+            front_pages = len(front.pages)
+        
+        pdf_bytes = front.copy([page for document in [front] + sections for page in document.pages]).write_pdf()
+        if progress:
+            progress("PDF")
+        return pdf_bytes, None
+    
+    except PdfJobCancelled:
+        raise
+    except Exception as e:
+        print(f"Complete PDF export error: {e}")
+        return None, f"เกิดข้อผิดพลาดในการสร้าง PDF: {str(e)}"
 
 def create_complete_pdf_download_button(df):
     """Create download button for complete report PDF"""
@@ -2931,59 +5613,51 @@ def create_complete_pdf_download_button(df):
         st.error("PDF export ไม่สามารถใช้งานได้ กรุณาติดตั้ง weasyprint และ jinja2")
         return
     
-    if st.button("Export รายงานฉบับสมบูรณ์ (All Pages)", 
-                 key="export_complete_pdf",
-                 help="Export ทุกหน้าในรายงานเดียว"):
-        
-        try:
-            with st.spinner("กำลังสร้างรายงานฉบับสมบูรณ์..."):
-                # Generate complete HTML
-                html_content = generate_complete_report_html(df)
-                
-                # Create PDF template
-                template = create_pdf_template()
-                full_html = template.render(
-                    title="Suitcase Insights - Complete Report",
-                    subtitle="การวิเคราะห์พฤติกรรมผู้บริโภคกระเป๋าเดินทางแบบครบถ้วน",
-                    date=pd.Timestamp.now().strftime("%d/%m/%Y %H:%M"),
-                    current_year=pd.Timestamp.now().year,
-                    content=html_content
-                )
-                
-                # Generate PDF with landscape orientation
-                pdf_bytes = HTML(string=full_html).write_pdf(
-                    stylesheets=[CSS(string='@page { size: A4 landscape; margin: 2cm; }')]
-                )
-                
-                if pdf_bytes:
-                    # Create download
-                    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"suitcase_insights_complete_report_{timestamp}.pdf"
-                    
-                    st.download_button(
-                        label="Download รายงานฉบับสมบูรณ์",
-                        data=pdf_bytes,
-                        file_name=filename,
-                        mime="application/pdf",
-                        key="download_complete_pdf"
-                    )
-                    
-                    st.success(f"สร้างรายงานฉบับสมบูรณ์เรียบร้อย! ({len(pdf_bytes)/1024:.1f} KB)")
-                else:
-                    st.error("ไม่สามารถสร้าง PDF ได้")
-                
-        except Exception as e:
-            st.error(f"เกิดข้อผิดพลาดในการสร้าง PDF: {str(e)}")
-            print(f"Complete PDF export error: {e}")
+    pdf_export_controls(
+        COMPLETE_REPORT, df,
+        label="Export รายงานฉบับสมบูรณ์ (All Pages)",
+        key="export_complete_pdf",
+        download_key="download_complete_pdf",
+        file_stem="suitcase_insights_complete_report",
+        help="Export ทุกหน้าในรายงานเดียว"
+    )
 
 def main():
     st.title("Suitcase Insights Dashboard")
     st.markdown("### การวิเคราะห์ข้อมูลการสำรวจพฤติกรรมผู้บริโภคกระเป๋าเดินทาง")
     
+    # Sidebar
+    st.sidebar.title("Navigation")
+    page = st.sidebar.selectbox(
+        "เลือกหน้าที่ต้องการดู",
+        ["ภาพรวม", "ข้อมูลประชากรศาสตร์", "ปัจจัยการตัดสินใจ", 
+         "ความต้องการผลิตภัณฑ์", "ความอ่อนไหวต่อราคา", "ช่องทางการขาย",
+         "การตลาด", "Brand Awareness", "Brand Image & Barriers",
+         "Customer Personas"]
+    )
+    
+    # Wave selector (only the chosen waves are read from storage)
+    waves = discover_waves()
+    selected_waves = list(waves)
+    if len(waves) > 1:
+        selected_waves = st.sidebar.multiselect(
+            "เลือก Wave การสำรวจ", list(waves), default=list(waves)[-1:]
+        )
+        if not selected_waves:
+            st.warning("กรุณาเลือกอย่างน้อย 1 Wave")
+            return
+    
     # Load data
-    df = load_data()
+    df = load_data(waves, selected_waves)
     if df is None:
         return
+    start_insight_mining(df)
+    
+    # Global respondent filter (every page and the PDF export use the same selection)
+    df = apply_respondent_filter(df, respondent_filter_sidebar(df))
+    if len(df) == 0:
+        st.warning("ไม่มีผู้ตอบแบบสอบถามที่ตรงกับตัวกรองที่เลือก")
+        return
     
     # Add complete report export button at the top
     st.markdown("---")
@@ -2992,16 +5666,6 @@ def main():
         create_complete_pdf_download_button(df)
     st.markdown("---")
     
-    # Sidebar
-    st.sidebar.title("Navigation")
-    page = st.sidebar.selectbox(
-        "เลือกหน้าที่ต้องการดู",
-        ["ภาพรวม", "ข้อมูลประชากรศาสตร์", "ปัจจัยการตัดสินใจ", 
-         "ความต้องการผลิตภัณฑ์", "ความอ่อนไหวต่อราคา", "ช่องทางการขาย",
-         "การตลาด", "Brand Awareness", "Brand Image & Barriers",
-         "Customer Personas"]
-    )
-    
     # Display metrics in sidebar
     st.sidebar.markdown("---")
     st.sidebar.markdown("### ข้อมูลพื้นฐาน")
@@ -3025,12 +5689,12 @@ def main():
                 box-shadow: 0 4px 15px rgba(69, 183, 209, 0.2);">
         <h4 style="color: #45B7D1; margin-bottom: 10px; text-align: center;">จำนวนคำถาม</h4>
         <h2 style="color: #E8F4F8; text-align: center; margin: 0; 
-                   text-shadow: 0 0 10px rgba(69, 183, 209, 0.6);">{len(df.columns)} ข้อ</h2>
+                   text-shadow: 0 0 10px rgba(69, 183, 209, 0.6);">{len(get_survey_schema(df).questions)} ข้อ</h2>
     </div>
     """, unsafe_allow_html=True)
     
     # Gender distribution with enhanced styling
-    gender_dist = df['gender'].value_counts()
+    gender_dist = category_counts(df['gender'])
     st.sidebar.markdown(f"""
     <div style="background: linear-gradient(135deg, rgba(255, 107, 157, 0.2), rgba(78, 205, 196, 0.2)); 
                 padding: 15px; border-radius: 12px; margin: 10px 0; 
@@ -3078,10 +5742,14 @@ def main():
         show_brand_image(df)
     elif page == "Customer Personas":
         show_personas(df)
+    
+    # Drawn last so the counts include this run's exports
+    chart_cache_sidebar()
 
 def show_overview(df):
     """Show overview page"""
     st.header("ภาพรวมผลการสำรวจ")
+    stats = get_page_stats("overview", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3098,38 +5766,34 @@ def show_overview(df):
             <h2>{}</h2>
             <p>คน</p>
         </div>
-        """.format(len(df)), unsafe_allow_html=True)
+        """.format(stats.n_respondents), unsafe_allow_html=True)
     
     with col2:
-        avg_age = df['age'].mean()
         st.markdown("""
         <div class="metric-card">
             <h3>อายุเฉลี่ย</h3>
             <h2>{:.1f}</h2>
             <p>ปี</p>
         </div>
-        """.format(avg_age), unsafe_allow_html=True)
+        """.format(stats.avg_age), unsafe_allow_html=True)
     
     with col3:
-        gender_counts = df['gender'].value_counts()
-        female_count = gender_counts.get('หญิง', 0)
         st.markdown("""
         <div class="metric-card">
             <h3>เพศหญิง</h3>
             <h2>{}</h2>
             <p>คน ({:.1f}%)</p>
         </div>
-        """.format(female_count, (female_count/len(df)*100)), unsafe_allow_html=True)
+        """.format(stats.female_count, stats.female_pct), unsafe_allow_html=True)
     
     with col4:
-        student_pct = (df['occupation'] == 'นักเรียน/นักศึกษา').mean() * 100
         st.markdown("""
         <div class="metric-card">
             <h3>นักเรียน/นักศึกษา</h3>
             <h2>{:.1f}%</h2>
             <p>ของผู้ตอบ</p>
         </div>
-        """.format(student_pct), unsafe_allow_html=True)
+        """.format(stats.student_pct), unsafe_allow_html=True)
     
     # Gender breakdown section
     st.markdown("---")
@@ -3137,9 +5801,9 @@ def show_overview(df):
     
     col1, col2 = st.columns([2, 1])
     
+    gender_counts = stats.gender_counts
+    
     with col1:
-        gender_counts = df['gender'].value_counts()
-        
         fig_gender = px.pie(
             values=gender_counts.values,
             names=gender_counts.index,
@@ -3152,7 +5816,7 @@ def show_overview(df):
     with col2:
         st.markdown("**จำนวนตามเพศ:**")
         for gender, count in gender_counts.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / stats.n_respondents) * 100
             st.markdown(f"- **{gender}**: {count} คน ({percentage:.1f}%)")
     
     # Key insights
@@ -3160,10 +5824,9 @@ def show_overview(df):
     st.subheader("ข้อค้นพบสำคัญ")
     
     # Factor analysis
-    factor_cols = [c for c in df.columns if c.startswith("factor_")]
-    if factor_cols:
-        factor_means = df[factor_cols].mean().sort_values(ascending=False)
-        top_factor = factor_means.index[0].replace("factor_", "").replace("_", " ")
+    factor_means = stats.factor_means
+    if not factor_means.empty:
+        top_factor = likert_display_name(factor_means.index[0])
         
         st.markdown(f"""
         <div class="insight-box">
@@ -3173,28 +5836,35 @@ def show_overview(df):
         """, unsafe_allow_html=True)
     
     # Price sensitivity
-    if 'preferred_price_range' in df.columns:
-        popular_price = df['preferred_price_range'].mode().iloc[0] if not df['preferred_price_range'].mode().empty else "ไม่ระบุ"
+    if stats.popular_price is not None:
         st.markdown(f"""
         <div class="insight-box">
             <h4>ช่วงราคาที่นิยม</h4>
-            <p><strong>{popular_price}</strong> เป็นช่วงราคาที่ผู้ตอบแบบสำรวจเลือกมากที่สุด</p>
+            <p><strong>{stats.popular_price}</strong> เป็นช่วงราคาที่ผู้ตอบแบบสำรวจเลือกมากที่สุด</p>
         </div>
         """, unsafe_allow_html=True)
     
     # Travel frequency
-    if 'luggage_frequency' in df.columns:
-        popular_freq = df['luggage_frequency'].mode().iloc[0] if not df['luggage_frequency'].mode().empty else "ไม่ระบุ"
+    if stats.popular_frequency is not None:
         st.markdown(f"""
         <div class="insight-box">
             <h4>ความถี่ในการเดินทาง</h4>
-            <p><strong>{popular_freq}</strong> เป็นความถี่ที่พบมากที่สุด</p>
+            <p><strong>{stats.popular_frequency}</strong> เป็นความถี่ที่พบมากที่สุด</p>
         </div>
         """, unsafe_allow_html=True)
+    
+    # Findings from the background miner
+    st.markdown("---")
+    insights_panel(df)
+    
+    # Ad hoc A x B tables for analysts
+    st.markdown("---")
+    crosstab_explorer(df)
 
 def show_demographics(df):
     """Show demographics analysis"""
     st.header("ข้อมูลประชากรศาสตร์")
+    stats = get_page_stats("demographics", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3206,7 +5876,7 @@ def show_demographics(df):
     with col1:
         # Gender distribution
         st.subheader("การกระจายตามเพศ")
-        gender_counts = df['gender'].value_counts()
+        gender_counts = stats.gender_counts
         
         fig_gender = px.pie(
             values=gender_counts.values,
@@ -3222,14 +5892,14 @@ def show_demographics(df):
         gender_df = pd.DataFrame({
             'เพศ': gender_counts.index,
             'จำนวน (คน)': gender_counts.values,
-            'สัดส่วน (%)': [f"{(count/len(df)*100):.1f}%" for count in gender_counts.values]
+            'สัดส่วน (%)': [f"{(count/stats.n_respondents*100):.1f}%" for count in gender_counts.values]
         })
         st.dataframe(gender_df, use_container_width=True, hide_index=True)
     
     with col2:
         # Age distribution
         st.subheader("การกระจายตามอายุ")
-        age_counts = df['age_group'].value_counts().sort_index()
+        age_counts = stats.age_counts
         
         fig_age = px.bar(
             x=age_counts.index,
@@ -3247,7 +5917,7 @@ def show_demographics(df):
     with col3:
         # Income distribution
         st.subheader("การกระจายตามรายได้")
-        income_counts = df['income_group'].value_counts().sort_index()
+        income_counts = stats.income_counts
         
         fig_income = px.bar(
             x=income_counts.index,
@@ -3262,7 +5932,7 @@ def show_demographics(df):
     with col4:
         # Occupation distribution
         st.subheader("การกระจายตามอาชีพ")
-        occupation_counts = df['occupation'].value_counts().head(10)
+        occupation_counts = stats.occupation_counts
         
         fig_occupation = px.bar(
             x=occupation_counts.values,
@@ -3284,17 +5954,17 @@ def show_factors(df):
     create_pdf_download_button("ปัจจัยการตัดสินใจ", df)
     st.markdown("---")
     
-    factor_cols = [c for c in df.columns if c.startswith("factor_")]
+    stats = get_page_stats("factors", df)
     
-    if not factor_cols:
+    if stats.factor_means.empty:
         st.warning("ไม่พบข้อมูลปัจจัยการตัดสินใจ")
         return
     
     # Overall importance ranking
     st.subheader("ลำดับความสำคัญของปัจจัยโดยรวม")
     
-    factor_means = df[factor_cols].mean().sort_values(ascending=False)
-    factor_names = [col.replace("factor_", "").replace("_", " ").title() for col in factor_means.index]
+    factor_means = stats.factor_means
+    factor_names = [likert_display_name(col) for col in factor_means.index]
     
     fig_factors = px.bar(
         x=factor_means.values,
@@ -3303,7 +5973,8 @@ def show_factors(df):
         title="คะแนนเฉลี่ยความสำคัญของปัจจัยต่างๆ (1-5)",
         labels={'x': 'คะแนนเฉลี่ย', 'y': 'ปัจจัย'},
         color=factor_means.values,
-        color_continuous_scale='RdYlGn'
+        color_continuous_scale='RdYlGn',
+        **ci_error_bars(factor_means, stats.factor_ci)
     )
     fig_factors.update_layout(height=600)
     st.plotly_chart(fig_factors, use_container_width=True)
@@ -3313,10 +5984,8 @@ def show_factors(df):
     
     with col1:
         st.subheader("ปัจจัยความสำคัญตามเพศ")
-        gender_factors = df.groupby('gender')[factor_cols].mean()
-        
         fig_gender_factors = px.imshow(
-            gender_factors.T,
+            mark_significant(stats.gender_factors, stats.gender_markers).T,
             title="Heatmap: ความสำคัญของปัจจัยตามเพศ",
             labels=dict(x="เพศ", y="ปัจจัย", color="คะแนนเฉลี่ย"),
             aspect="auto",
@@ -3326,21 +5995,22 @@ def show_factors(df):
     
     with col2:
         st.subheader("ปัจจัยความสำคัญตามรายได้")
-        if 'income_group' in df.columns:
-            income_factors = df.groupby('income_group', observed=False)[factor_cols].mean()
-            
+        if stats.income_factors is not None:
             fig_income_factors = px.imshow(
-                income_factors.T,
+                mark_significant(stats.income_factors, stats.income_markers).T,
                 title="Heatmap: ความสำคัญของปัจจัยตามรายได้",
                 labels=dict(x="กลุ่มรายได้", y="ปัจจัย", color="คะแนนเฉลี่ย"),
                 aspect="auto",
                 color_continuous_scale='RdYlBu_r'
             )
             st.plotly_chart(fig_income_factors, use_container_width=True)
+    
+    st.caption(SIGNIFICANCE_NOTE)
 
 def show_products(df):
     """Show product preferences analysis"""
     st.header(" ความต้องการด้านผลิตภัณฑ์")
+    stats = get_page_stats("products", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3350,12 +6020,11 @@ def show_products(df):
     col1, col2 = st.columns(2)
     
     # Style preferences
-    if 'preferred_styles' in df.columns:
+    if stats.style_counts is not None:
         with col1:
             st.subheader(" สไตล์/สีที่ต้องการ")
             
-            style_long = explode_multiselect(df['preferred_styles'], clean_func=normalize_th)
-            style_counts = style_long['value'].value_counts().head(10)
+            style_counts = stats.style_counts
             
             fig_styles = px.bar(
                 x=style_counts.values,
@@ -3369,12 +6038,11 @@ def show_products(df):
             st.plotly_chart(fig_styles, use_container_width=True)
     
     # Bag types
-    if 'used_bag_types' in df.columns:
+    if stats.bag_counts is not None:
         with col2:
             st.subheader(" ประเภทกระเป๋าที่ใช้")
             
-            bag_long = explode_multiselect(df['used_bag_types'], clean_func=normalize_th)
-            bag_counts = bag_long['value'].value_counts().head(8)
+            bag_counts = stats.bag_counts
             
             fig_bags = px.pie(
                 values=bag_counts.values,
@@ -3385,10 +6053,10 @@ def show_products(df):
             st.plotly_chart(fig_bags, use_container_width=True)
     
     # Size preferences
-    if 'luggage_size_short_trip' in df.columns:
+    if stats.size_counts is not None:
         st.subheader(" ขนาดกระเป๋าที่ต้องการ")
         
-        size_counts = df['luggage_size_short_trip'].value_counts()
+        size_counts = stats.size_counts
         
         fig_sizes = px.bar(
             x=size_counts.index,
@@ -3403,6 +6071,7 @@ def show_products(df):
 def show_pricing(df):
     """Show price sensitivity analysis"""
     st.header(" ความอ่อนไหวต่อราคา")
+    stats = get_page_stats("pricing", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3410,11 +6079,10 @@ def show_pricing(df):
     st.markdown("---")
     
     # Price range preferences
-    price_col = 'preferred_price_range ' if 'preferred_price_range ' in df.columns else 'preferred_price_range'
-    if price_col in df.columns:
+    if stats.price_counts is not None:
         st.subheader(" ช่วงราคาที่ต้องการ")
         
-        price_counts = df[price_col].value_counts()
+        price_counts = stats.price_counts
         
         fig_price = px.bar(
             x=price_counts.index,
@@ -3426,25 +6094,16 @@ def show_pricing(df):
         st.plotly_chart(fig_price, use_container_width=True)
     
     # Price factors analysis (Likert scale factors only)
-    price_factor_cols = [c for c in df.columns if c.startswith("price_") and c not in ['price_midpoint', 'price_min', 'price_max', 'price_mid']]
-    
-    if price_factor_cols:
+    if not stats.price_means.empty:
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader(" ปัจจัยด้านราคา")
             
-            price_means = df[price_factor_cols].mean().sort_values(ascending=False)
+            price_means = stats.price_means
             
-            # Create Thai names for price factors
-            factor_name_mapping = {
-                'price_within_budget': 'อยู่ในงบประมาณ',
-                'price_value_for_quality': 'คุ้มค่าต่อคุณภาพ', 
-                'price_vs_competitor': 'เทียบกับคู่แข่ง',
-                'price_image_boost': 'เพิ่มภาพลักษณ์'
-            }
-            
-            price_names = [factor_name_mapping.get(col, col.replace("price_", "").replace("_", " ").title()) for col in price_means.index]
+            # Display names come from the survey schema (Thai labels for price factors)
+            price_names = [likert_display_name(col) for col in price_means.index]
             
             fig_price_factors = px.bar(
                 x=price_means.values,
@@ -3453,7 +6112,8 @@ def show_pricing(df):
                 title="ความสำคัญของปัจจัยด้านราคา (คะแนน 1-5)",
                 labels={'x': 'คะแนนเฉลี่ย', 'y': 'ปัจจัยด้านราคา'},
                 color=price_means.values,
-                color_continuous_scale='Blues'
+                color_continuous_scale='Blues',
+                **ci_error_bars(price_means, stats.price_ci)
             )
             fig_price_factors.update_layout(
                 xaxis=dict(range=[1, 5]),  # Set range for Likert scale
@@ -3464,84 +6124,35 @@ def show_pricing(df):
         with col2:
             st.subheader(" ราคา vs รายได้")
             
-            price_col = 'preferred_price_range ' if 'preferred_price_range ' in df.columns else 'preferred_price_range'
-            if 'income_group' in df.columns and price_col in df.columns:
-                # Clean data first - remove NaN income groups
-                clean_df = df.dropna(subset=['income_group', price_col])
+            if 'income_group' in df.columns and stats.price_col:
+                price_income = stats.price_income
                 
-                if len(clean_df) > 0:
-                    # Cross-tabulation
-                    price_income = pd.crosstab(clean_df['income_group'], clean_df[price_col])
+                if price_income is not None:
+                    fig_price_income = px.imshow(
+                        price_income.values,
+                        x=price_income.columns,
+                        y=price_income.index,
+                        title="ความสัมพันธ์ระหว่างรายได้กับช่วงราคาที่ต้องการ",
+                        labels=dict(x="ช่วงราคา", y="กลุ่มรายได้", color="จำนวนคน"),
+                        color_continuous_scale='Blues'
+                    )
+                    fig_price_income.update_layout(
+                        xaxis={'side': 'bottom'},
+                        height=400
+                    )
+                    st.plotly_chart(fig_price_income, use_container_width=True)
                     
-                    # Only proceed if we have data
-                    if not price_income.empty and price_income.sum().sum() > 0:
-                        fig_price_income = px.imshow(
-                            price_income.values,
-                            x=price_income.columns,
-                            y=price_income.index,
-                            title="ความสัมพันธ์ระหว่างรายได้กับช่วงราคาที่ต้องการ",
-                            labels=dict(x="ช่วงราคา", y="กลุ่มรายได้", color="จำนวนคน"),
-                            color_continuous_scale='Blues'
-                        )
-                        fig_price_income.update_layout(
-                            xaxis={'side': 'bottom'},
-                            height=400
-                        )
-                        st.plotly_chart(fig_price_income, use_container_width=True)
-                        
-                        # Add summary table
-                        st.markdown("**ตารางสรุป:**")
-                        summary_df = price_income.reset_index()
-                        st.dataframe(summary_df, use_container_width=True)
-                    else:
-                        # Alternative visualization using existing price_midpoint column
-                        st.markdown("**การวิเคราะห์ราคาเฉลี่ยที่ต้องการตามรายได้**")
-                        
-                        # Use the price_midpoint column that was created during data loading
-                        if 'price_midpoint' in clean_df.columns:
-                            # Remove NaN price midpoints
-                            price_df = clean_df.dropna(subset=['price_midpoint'])
-                            
-                            if len(price_df) > 0:
-                                # Calculate statistics by income group
-                                income_stats = price_df.groupby('income_group').agg({
-                                    'price_midpoint': ['mean', 'median', 'count'],
-                                    price_col: lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else 'ไม่มีข้อมูล'
-                                }).round(0)
-                                
-                                # Flatten column names
-                                income_stats.columns = ['ราคาเฉลี่ย', 'ราคากลาง', 'จำนวนคน', 'ช่วงราคาที่นิยม']
-                                
-                                # Create bar chart
-                                fig_price_avg = px.bar(
-                                    x=income_stats.index,
-                                    y=income_stats['ราคาเฉลี่ย'],
-                                    title="ราคาเฉลี่ยที่ต้องการตามกลุ่มรายได้",
-                                    labels={'x': 'กลุ่มรายได้', 'y': 'ราคาเฉลี่ย (บาท)'},
-                                    color=income_stats['ราคาเฉลี่ย'],
-                                    color_continuous_scale='Viridis',
-                                    text=income_stats['ราคาเฉลี่ย']
-                                )
-                                fig_price_avg.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                                fig_price_avg.update_layout(height=400)
-                                st.plotly_chart(fig_price_avg, use_container_width=True)
-                                
-                                # Display summary table
-                                st.markdown("**ตารางสรุป:**")
-                                display_stats = income_stats.copy()
-                                display_stats['ราคาเฉลี่ย'] = display_stats['ราคาเฉลี่ย'].apply(lambda x: f"{x:,.0f} บาท")
-                                display_stats['ราคากลาง'] = display_stats['ราคากลาง'].apply(lambda x: f"{x:,.0f} บาท")
-                                st.dataframe(display_stats, use_container_width=True)
-                            else:
-                                st.warning("ไม่มีข้อมูลราคาที่สามารถประมวลผลได้")
-                        else:
-                            st.warning("ไม่พบข้อมูลราคา - กรุณาตรวจสอบการโหลดข้อมูล")
+                    # Add summary table
+                    st.markdown("**ตารางสรุป:**")
+                    summary_df = price_income.reset_index()
+                    st.dataframe(summary_df, use_container_width=True)
                 else:
                     st.warning("ไม่มีข้อมูลเพียงพอสำหรับการวิเคราะห์ราคา vs รายได้")
 
 def show_channels(df):
     """Show sales channels analysis"""
     st.header(" ช่องทางการขาย")
+    stats = get_page_stats("channels", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3549,10 +6160,10 @@ def show_channels(df):
     st.markdown("---")
     
     # Platform usage
-    if 'most_used_platform' in df.columns:
+    if stats.platform_counts is not None:
         st.subheader(" แพลตฟอร์มที่ใช้มากที่สุด")
         
-        platform_counts = df['most_used_platform'].value_counts().head(10)
+        platform_counts = stats.platform_counts
         
         fig_platforms = px.pie(
             values=platform_counts.values,
@@ -3563,14 +6174,13 @@ def show_channels(df):
         st.plotly_chart(fig_platforms, use_container_width=True)
     
     # Purchase channels
-    if 'purchase_channels' in df.columns:
+    if stats.channel_counts is not None:
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("🛒 ช่องทางการซื้อ")
             
-            channel_long = explode_multiselect(df['purchase_channels'], clean_func=normalize_th)
-            channel_counts = channel_long['value'].value_counts().head(10)
+            channel_counts = stats.channel_counts
             
             fig_channels = px.bar(
                 x=channel_counts.values,
@@ -3585,37 +6195,21 @@ def show_channels(df):
             # Channel preferences by age
             st.subheader(" ช่องทางการซื้อตามอายุ")
             
-            if 'age_group' in df.columns:
-                # สร้าง cross-tabulation แบบง่าย
-                age_channel_data = []
-                for age_grp in df['age_group'].cat.categories:
-                    age_subset = df[df['age_group'] == age_grp]
-                    if len(age_subset) > 0:
-                        # เอาช่องทางที่นิยมที่สุดในแต่ละกลุ่มอายุ
-                        top_channels = age_subset['most_used_platform'].value_counts().head(3)
-                        for channel, count in top_channels.items():
-                            age_channel_data.append({
-                                'age_group': age_grp,
-                                'channel': channel,
-                                'count': count
-                            })
-                
-                if age_channel_data:
-                    age_channel_df = pd.DataFrame(age_channel_data)
-                    
-                    fig_age_channel = px.bar(
-                        age_channel_df,
-                        x='age_group',
-                        y='count',
-                        color='channel',
-                        title="ช่องทางที่นิยมตามกลุ่มอายุ",
-                        labels={'x': 'กลุ่มอายุ', 'y': 'จำนวนคน', 'color': 'ช่องทาง'}
-                    )
-                    st.plotly_chart(fig_age_channel, use_container_width=True)
+            if stats.age_channels is not None:
+                fig_age_channel = px.bar(
+                    stats.age_channels,
+                    x='age_group',
+                    y='count',
+                    color='channel',
+                    title="ช่องทางที่นิยมตามกลุ่มอายุ",
+                    labels={'x': 'กลุ่มอายุ', 'y': 'จำนวนคน', 'color': 'ช่องทาง'}
+                )
+                st.plotly_chart(fig_age_channel, use_container_width=True)
 
 def show_marketing(df):
     """Show marketing preferences analysis"""
     st.header(" Marketing Preferences")
+    stats = get_page_stats("marketing", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3623,14 +6217,11 @@ def show_marketing(df):
     st.markdown("---")
     
     # Promotion preferences
-    promo_cols = [c for c in df.columns if c.startswith("promo_")]
-    
-    if promo_cols:
+    if not stats.promo_means.empty:
         st.subheader(" ประสิทธิภาพของโปรโมชั่นแต่ละประเภท")
         
-        # Calculate average scores for each promotion type
-        promo_means = df[promo_cols].mean().sort_values(ascending=False)
-        promo_names = [col.replace("promo_", "").replace("_", " ").title() for col in promo_means.index]
+        promo_means = stats.promo_means
+        promo_names = [likert_display_name(col) for col in promo_means.index]
         
         # Create insights based on scores
         col1, col2 = st.columns(2)
@@ -3643,7 +6234,8 @@ def show_marketing(df):
                 title="คะแนนเฉลี่ยประสิทธิภาพโปรโมชั่น (1-5)",
                 labels={'x': 'คะแนนเฉลี่ย', 'y': 'ประเภทโปรโมชั่น'},
                 color=promo_means.values,
-                color_continuous_scale='RdYlGn'
+                color_continuous_scale='RdYlGn',
+                **ci_error_bars(promo_means, stats.promo_ci)
             )
             fig_promo.update_layout(height=400)
             st.plotly_chart(fig_promo, use_container_width=True)
@@ -3671,11 +6263,10 @@ def show_marketing(df):
             """, unsafe_allow_html=True)
     
     # Presenter preferences
-    if 'preferred_presenter' in df.columns:
+    if stats.presenter_counts is not None:
         st.subheader(" พรีเซนเตอร์ที่ต้องการ")
         
-        presenter_counts = df['preferred_presenter'].value_counts().head(10)
-        presenter_counts = presenter_counts[presenter_counts.index != '-']  # Remove empty values
+        presenter_counts = stats.presenter_counts
         
         if len(presenter_counts) > 0:
             fig_presenter = px.bar(
@@ -3690,6 +6281,7 @@ def show_marketing(df):
 def show_brand_awareness(df):
     """Show T.Partner brand awareness analysis"""
     st.header(" Brand Awareness - T.Partner")
+    stats = get_page_stats("brand_awareness", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3697,10 +6289,10 @@ def show_brand_awareness(df):
     st.markdown("---")
     
     # Brand recognition level
-    if 'know_tpartner' in df.columns:
+    if stats.awareness_counts is not None:
         st.subheader(" ระดับการรู้จักแบรนด์ T.Partner")
         
-        awareness_counts = df['know_tpartner'].value_counts()
+        awareness_counts = stats.awareness_counts
         
         col1, col2 = st.columns(2)
         
@@ -3713,11 +6305,10 @@ def show_brand_awareness(df):
             st.plotly_chart(fig_awareness, use_container_width=True)
         
         with col2:
-            # Calculate key metrics
-            total_respondents = len(df)
-            know_brand = (df['know_tpartner'] == 'รู้จัก และรู้ว่าเป็นแบรนด์กระเป๋าเดินทาง').sum()
-            seen_before = (df['know_tpartner'] == 'เคยเห็นผ่านตา แต่ไม่แน่ใจว่าแบรนด์ทำอะไร').sum()
-            never_heard = (df['know_tpartner'] == 'ไม่รู้จักมาก่อนเลย').sum()
+            total_respondents = stats.n_respondents
+            know_brand = stats.know_brand
+            seen_before = stats.seen_before
+            never_heard = stats.never_heard
             
             st.markdown(f"""
             <div class="metric-card">
@@ -3732,13 +6323,8 @@ def show_brand_awareness(df):
     if 'tpartner_first_channel' in df.columns:
         st.subheader("📡 ช่องทางที่รู้จักแบรนด์ครั้งแรก")
         
-        # Filter out non-responses
-        first_channel_data = df[df['tpartner_first_channel'].notna() & 
-                                (df['tpartner_first_channel'] != '') & 
-                                (df['tpartner_first_channel'] != '-')]
-        
-        if len(first_channel_data) > 0:
-            channel_counts = first_channel_data['tpartner_first_channel'].value_counts().head(10)
+        if stats.first_channel_counts is not None:
+            channel_counts = stats.first_channel_counts
             
             fig_channels = px.bar(
                 x=channel_counts.index,
@@ -3752,7 +6338,7 @@ def show_brand_awareness(df):
             # Key insight
             top_channel = channel_counts.index[0]
             top_count = channel_counts.iloc[0]
-            total_responses = len(first_channel_data)
+            total_responses = stats.first_channel_responses
             
             st.markdown(f"""
             <div class="insight-box">
@@ -3766,6 +6352,7 @@ def show_brand_awareness(df):
 def show_brand_image(df):
     """Show brand image and barriers to purchase analysis"""
     st.header(" Brand Image & Barriers to Purchase")
+    stats = get_page_stats("brand_image", df)
     
     # PDF Export Button
     st.markdown("---")
@@ -3776,12 +6363,8 @@ def show_brand_image(df):
     if 'tpartner_positioning' in df.columns:
         st.subheader(" การรับรู้ positioning ของแบรนด์")
         
-        positioning_data = df[df['tpartner_positioning'].notna() & 
-                             (df['tpartner_positioning'] != '') & 
-                             (df['tpartner_positioning'] != '-')]
-        
-        if len(positioning_data) > 0:
-            positioning_counts = positioning_data['tpartner_positioning'].value_counts().head(8)
+        if stats.positioning_counts is not None:
+            positioning_counts = stats.positioning_counts
             
             fig_positioning = px.bar(
                 x=positioning_counts.values,
@@ -3799,34 +6382,8 @@ def show_brand_image(df):
         if 'first_impression' in df.columns:
             st.subheader(" First Impression")
             
-            impression_data = df[df['first_impression'].notna() & 
-                               (df['first_impression'] != '') & 
-                               (df['first_impression'] != '-')]
-            
-            if len(impression_data) > 0:
-                # Simple sentiment analysis based on keywords
-                positive_keywords = ['ดี', 'สวย', 'น่าสนใจ', 'ชอบ', 'ทันสมัย', 'หรู', 'คุณภาพ']
-                neutral_keywords = ['เรียบ', 'ธรรมดา', 'ปกติ', 'กลางๆ']
-                negative_keywords = ['ไม่', 'แพง', 'เก่า', 'น่าเบื่อ']
-                
-                def classify_sentiment(text):
-                    if pd.isna(text):
-                        return 'ไม่ระบุ'
-                    text = str(text).lower()
-                    
-                    positive_score = sum(1 for word in positive_keywords if word in text)
-                    negative_score = sum(1 for word in negative_keywords if word in text)
-                    
-                    if positive_score > negative_score:
-                        return 'เชิงบวก'
-                    elif negative_score > positive_score:
-                        return 'เชิงลบ'
-                    else:
-                        return 'กลางๆ'
-                
-                impression_data = impression_data.copy()
-                impression_data['sentiment'] = impression_data['first_impression'].apply(classify_sentiment)
-                sentiment_counts = impression_data['sentiment'].value_counts()
+            if stats.sentiment_counts is not None:
+                sentiment_counts = stats.sentiment_counts
                 
                 fig_sentiment = px.pie(
                     values=sentiment_counts.values,
@@ -3841,10 +6398,10 @@ def show_brand_image(df):
                 st.plotly_chart(fig_sentiment, use_container_width=True)
     
     with col2:
-        if 'considered_tpartner' in df.columns:
+        if stats.considered_counts is not None:
             st.subheader(" เคยพิจารณาซื้อ T.Partner หรือไม่")
             
-            considered_counts = df['considered_tpartner'].value_counts()
+            considered_counts = stats.considered_counts
             
             fig_considered = px.pie(
                 values=considered_counts.values,
@@ -3857,13 +6414,8 @@ def show_brand_image(df):
     if 'reason_not_chosen' in df.columns:
         st.subheader(" เหตุผลที่ยังไม่ซื้อ / Barriers to Purchase")
         
-        barrier_data = df[df['reason_not_chosen'].notna() & 
-                         (df['reason_not_chosen'] != '') & 
-                         (df['reason_not_chosen'] != '-')]
-        
-        if len(barrier_data) > 0:
-            # Count common barriers
-            barrier_counts = barrier_data['reason_not_chosen'].value_counts().head(10)
+        if stats.barrier_counts is not None:
+            barrier_counts = stats.barrier_counts
             
             fig_barriers = px.bar(
                 x=barrier_counts.values,
@@ -3880,7 +6432,7 @@ def show_brand_image(df):
             # Key insights
             top_barrier = barrier_counts.index[0]
             top_barrier_count = barrier_counts.iloc[0]
-            total_barriers = len(barrier_data)
+            total_barriers = stats.barrier_responses
             
             st.markdown(f"""
             <div class="warning-box">
@@ -3894,10 +6446,9 @@ def show_brand_image(df):
             # Actionable insights
             st.subheader(" ข้อเสนอแนะเชิงกลยุทธ์")
             
-            # Analyze barriers and provide recommendations
-            price_related = barrier_data['reason_not_chosen'].str.contains('แพง|ราคา|คุ้ม', case=False, na=False).sum()
-            quality_related = barrier_data['reason_not_chosen'].str.contains('คุณภาพ|ทน|รีวิว', case=False, na=False).sum()
-            availability_related = barrier_data['reason_not_chosen'].str.contains('หา|ซื้อ|ไม่รู้', case=False, na=False).sum()
+            price_related = stats.barrier_theme_counts['price']
+            quality_related = stats.barrier_theme_counts['quality']
+            availability_related = stats.barrier_theme_counts['availability']
             
             col3, col4, col5 = st.columns(3)
             
@@ -3944,65 +6495,19 @@ def show_personas(df):
     </div>
     """, unsafe_allow_html=True)
     
-    # Prepare data for clustering
-    feature_cols = []
-    
-    # 1. Demographics (encoded)
-    demo_cols = ['gender', 'age', 'monthly_income']
-    
-    # 2. Behavioral factors
-    behavior_cols = [c for c in df.columns if c in ['luggage_frequency', 'buy_frequency']]
-    
-    # 3. Value/Belief factors (Likert scales)
-    factor_cols = [c for c in df.columns if c.startswith('factor_')]
-    
-    # 4. Price sensitivity (Likert scales)
-    price_cols = [c for c in df.columns if c.startswith('price_') and c not in ['price_midpoint', 'price_min', 'price_max', 'price_mid']]
-    
-    # 5. Channel preferences (Likert scales)
-    channel_cols = [c for c in df.columns if c.startswith('channel_')]
-    
-    # 6. Marketing preferences (Likert scales)
-    promo_cols = [c for c in df.columns if c.startswith('promo_')]
+    stats = get_page_stats("personas", df)
     
     # Create persona analysis
     st.subheader(" การวิเคราะห์แบบกลุ่ม (Cluster Analysis)")
     
-    # Prepare numerical data for clustering
-    cluster_data = df[factor_cols + price_cols + channel_cols + promo_cols].copy()
-    
     # Simple clustering based on key behavioral patterns
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader(" Persona แบบ Value-Based")
         
-        # Create value-based personas
-        df_analysis = df.copy()
-        
-        # Calculate key scores
-        df_analysis['quality_focus'] = df_analysis[['factor_durability', 'factor_warranty', 'price_value_for_quality']].mean(axis=1)
-        df_analysis['price_sensitive'] = df_analysis[['price_within_budget', 'promo_discount']].mean(axis=1)
-        df_analysis['brand_conscious'] = df_analysis[['factor_brand_trust', 'price_image_boost']].mean(axis=1)
-        df_analysis['convenience_focus'] = df_analysis[['channel_fast_shipping', 'channel_easy_to_find']].mean(axis=1)
-        
-        # Create persona categories
-        def categorize_persona(row):
-            if row['quality_focus'] >= 4.5 and row['price_sensitive'] <= 3.5:
-                return "Premium Quality Seeker"
-            elif row['price_sensitive'] >= 4.5 and row['quality_focus'] >= 4.0:
-                return "Value Hunter"
-            elif row['brand_conscious'] >= 4.0:
-                return "Brand Loyalist" 
-            elif row['convenience_focus'] >= 4.5:
-                return "Convenience Lover"
-            else:
-                return "Practical Buyer"
-        
-        df_analysis['persona_type'] = df_analysis.apply(categorize_persona, axis=1)
-        
         # Show persona distribution
-        persona_counts = df_analysis['persona_type'].value_counts()
+        persona_counts = stats.persona_counts
         
         fig_personas = px.pie(
             values=persona_counts.values,
@@ -4017,7 +6522,7 @@ def show_personas(df):
         
         # Price vs Quality Matrix
         fig_matrix = px.scatter(
-            df_analysis,
+            stats.scores,
             x='price_sensitive',
             y='quality_focus',
             color='persona_type',
@@ -4035,57 +6540,44 @@ def show_personas(df):
     # Detailed Persona Profiles
     st.subheader(" รายละเอียด Persona แต่ละกลุ่ม")
     
-    for persona_name in persona_counts.index:
-        with st.expander(f"{persona_name} ({persona_counts[persona_name]} คน - {persona_counts[persona_name]/len(df)*100:.1f}%)"):
-            persona_df = df_analysis[df_analysis['persona_type'] == persona_name]
-            
+    for persona_name, profile in stats.profiles.items():
+        with st.expander(f"{persona_name} ({profile.count} คน - {profile.count/stats.n_respondents*100:.1f}%)"):
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 st.markdown("** Demographics**")
-                gender_dist = persona_df['gender'].value_counts()
-                st.write(f"• เพศหลัก: {gender_dist.index[0]} ({gender_dist.iloc[0]} คน)")
-                
-                avg_age = persona_df['age'].mean()
-                st.write(f"• อายุเฉลี่ย: {avg_age:.0f} ปี")
-                
-                top_income = persona_df['monthly_income'].mode().iloc[0] if len(persona_df) > 0 else "ไม่ระบุ"
-                st.write(f"• รายได้หลัก: {top_income}")
+                st.write(f"• เพศหลัก: {profile.top_gender} ({profile.top_gender_count} คน)")
+                st.write(f"• อายุเฉลี่ย: {profile.avg_age:.0f} ปี")
+                st.write(f"• รายได้หลัก: {profile.top_income}")
                 
                 st.markdown("**🛒 พฤติกรรม**")
-                if 'luggage_frequency' in persona_df.columns:
-                    top_freq = persona_df['luggage_frequency'].mode().iloc[0] if len(persona_df) > 0 else "ไม่ระบุ"
-                    st.write(f"• ความถี่ใช้งาน: {top_freq}")
+                if profile.top_frequency is not None:
+                    st.write(f"• ความถี่ใช้งาน: {profile.top_frequency}")
                 
-                if 'most_used_platform' in persona_df.columns:
-                    top_platform = persona_df['most_used_platform'].mode().iloc[0] if len(persona_df) > 0 else "ไม่ระบุ"
-                    st.write(f"• แพลตฟอร์มหลัก: {top_platform}")
+                if profile.top_platform is not None:
+                    st.write(f"• แพลตฟอร์มหลัก: {profile.top_platform}")
             
             with col2:
                 st.markdown("** ความเชื่อ & ค่านิยม**")
-                factor_scores = persona_df[factor_cols].mean().sort_values(ascending=False)
                 st.write("ปัจจัยสำคัญ Top 3:")
-                for i, (factor, score) in enumerate(factor_scores.head(3).items()):
-                    factor_name = factor.replace('factor_', '').replace('_', ' ').title()
+                for i, (factor, score) in enumerate(profile.factor_scores.head(3).items()):
+                    factor_name = likert_display_name(factor)
                     st.write(f"{i+1}. {factor_name}: {score:.1f}/5")
                 
                 st.markdown("** ความอ่อนไหวต่อราคา**")
-                price_scores = persona_df[price_cols].mean().sort_values(ascending=False)
-                for factor, score in price_scores.head(2).items():
-                    factor_name = factor.replace('price_', '').replace('_', ' ').title()
+                for factor, score in profile.price_scores.head(2).items():
+                    factor_name = likert_display_name(factor)
                     st.write(f"• {factor_name}: {score:.1f}/5")
             
             with col3:
                 st.markdown("** ช่องทางที่ต้องการ**")
-                channel_scores = persona_df[channel_cols].mean().sort_values(ascending=False)
-                for factor, score in channel_scores.head(3).items():
-                    factor_name = factor.replace('channel_', '').replace('_', ' ').title()
+                for factor, score in profile.channel_scores.head(3).items():
+                    factor_name = likert_display_name(factor)
                     st.write(f"• {factor_name}: {score:.1f}/5")
                 
                 st.markdown("** การตลาดที่ได้ผล**")
-                promo_scores = persona_df[promo_cols].mean().sort_values(ascending=False)
-                for factor, score in promo_scores.head(2).items():
-                    factor_name = factor.replace('promo_', '').replace('_', ' ').title()
+                for factor, score in profile.promo_scores.head(2).items():
+                    factor_name = likert_display_name(factor)
                     st.write(f"• {factor_name}: {score:.1f}/5")
     
     # Marketing Strategy Recommendations
@@ -4136,7 +6628,7 @@ def show_personas(df):
                 <p><strong> Message:</strong> {strategy['messaging']}</p>
                 <p><strong> Channels:</strong> {strategy['channels']}</p>
                 <p><strong> Promotion:</strong> {strategy['promotion']}</p>
-                <p><small> Target Size: {count} คน ({count/len(df)*100:.1f}% ของตลาด)</small></p>
+                <p><small> Target Size: {count} คน ({count/stats.n_respondents*100:.1f}% ของตลาด)</small></p>
             </div>
             """, unsafe_allow_html=True)
 